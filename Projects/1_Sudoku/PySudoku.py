@@ -1,11 +1,76 @@
 import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "objects"))
 import SudokuSquare
 from utils import *
 from GameResources import *
 
 
-def play(values, result, history):
+FPS = 5  # assignments shown per second; None replays the trace unthrottled
+
+
+def square_origin(x, y):
+    """Return the pixel position of the square in column x and row y of the board image"""
+    if x in (0, 1, 2):  startX = (x * 57) + 38
+    if x in (3, 4, 5):  startX = (x * 57) + 99
+    if x in (6, 7, 8):  startX = (x * 57) + 159
+
+    if y in (0, 1, 2):  startY = (y * 57) + 35
+    if y in (3, 4, 5):  startY = (y * 57) + 100
+    if y in (6, 7, 8):  startY = (y * 57) + 165
+    return startX, startY
+
+
+def to_number(string_number):
+    """Return the digit shown for a box value, or None if the box is unsolved"""
+    if len(string_number) > 1 or string_number == '' or string_number == '.':
+        return None
+    return int(string_number)
+
+
+class Board:
+    """The 81 squares of a board, kept alive between frames
+
+    Parameters
+    ----------
+    surface(pygame.Surface)
+        the surface to draw on: the display, or an offscreen surface
+
+    background(pygame.Surface)
+        the bare board image
+
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    def __init__(self, surface, background, values):
+        self.surface = surface
+        self.background = background
+        self.squares = {}
+        for y in range(9):
+            for x in range(9):
+                startX, startY = square_origin(x, y)
+                box = rows[y] + cols[x]
+                self.squares[box] = SudokuSquare.SudokuSquare(to_number(values[box]), startX, startY, "N", x, y)
+
+    def draw(self):
+        """Draw the whole board and return the area that changed"""
+        area = self.surface.blit(self.background, (0, 0))
+        for square in self.squares.values():
+            square.draw(self.surface)
+        return area
+
+    def assign(self, box, value):
+        """Show value in box, redrawing only that square, and return the area that changed"""
+        square = self.squares[box]
+        area = square.rect()
+        square.setNumber(to_number(value))
+        area = area.union(square.rect())
+        # restore the background under the old square before drawing the new one
+        self.surface.blit(self.background, area, area)
+        square.draw(self.surface)
+        return area
+
+
+def play(values, result, history, fps=FPS):
     assignments = reconstruct(result, history)
     pygame.init()
 
@@ -16,40 +81,15 @@ def play(values, result, history):
 
     clock = pygame.time.Clock()
 
-    while True:
+    board = Board(screen, background_image, values)
+    board.draw()
+    pygame.display.flip()
+
+    for box, value in assignments:
         pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
-        for y in range(9):
-            for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                string_number = values[rows[y] + cols[x]]
-                if len(string_number) > 1 or string_number == '' or string_number == '.':
-                    number = None
-                else:
-                    number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
-
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
-
-        pygame.display.flip()
-        pygame.display.update()
-        clock.tick(5)
-
-        if len(assignments) == 0:
-            break
-        box, value = assignments.pop()
-        values[box] = value
+        if fps:
+            clock.tick(fps)
+        pygame.display.update(board.assign(box, value))
 
     # leave game showing until closed by user
     while True:
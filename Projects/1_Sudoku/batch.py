@@ -0,0 +1,205 @@
+"""Solve large collections of Sudoku grids across a pool of worker processes.
+
+Grids are read lazily and submitted in chunks, with only a bounded number of
+chunks in flight at once, so arbitrarily large puzzle files can be streamed
+through the solver without loading them into memory.
+"""
+import argparse
+import os
+import sys
+import textwrap
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import variants
+import vecboard
+from solution import solve
+from utils import values2grid
+
+
+CHUNKSIZE = 64
+IN_FLIGHT = 4  # chunks submitted per worker ahead of the results being consumed
+INVALID = 'invalid'  # reported in place of a solution for malformed grids
+GRID_CHARS = frozenset('123456789.')
+ENGINES = ('bitmask', 'dlx', 'sat', 'numpy')
+
+
+def is_valid_grid(grid):
+    """Return True if grid is 81 characters of digits and '.' markers"""
+    return len(grid) == 81 and GRID_CHARS.issuperset(grid)
+
+
+def _solve_chunk(grids, engine='bitmask'):
+    """Solve a list of grids, returning (grid, solution) pairs (see solve_many)"""
+    if engine == 'numpy':
+        valid = [grid for grid in grids if is_valid_grid(grid)]
+        solved = iter(vecboard.solve_grids(valid, variants.get_tables('diagonal')))
+        return [(grid, next(solved) if is_valid_grid(grid) else INVALID) for grid in grids]
+    results = []
+    for grid in grids:
+        if not is_valid_grid(grid):
+            results.append((grid, INVALID))
+            continue
+        values = solve(grid, engine=engine)
+        results.append((grid, values2grid(values) if values else None))
+    return results
+
+
+def _chunks(grids, chunksize):
+    grids = iter(grids)
+    while True:
+        chunk = list(islice(grids, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_many(grids, workers=None, chunksize=CHUNKSIZE, ordered=True, engine='bitmask'):
+    """Solve an iterable of grid strings using a pool of worker processes
+
+    Parameters
+    ----------
+    grids(iterable)
+        the grid strings to solve; the iterable is consumed lazily
+
+    workers(int or None)
+        the number of worker processes (defaults to the number of CPUs); with
+        ``workers=1`` the grids are solved in the current process
+
+    chunksize(int)
+        the number of grids sent to a worker in each task
+
+    ordered(bool)
+        if True the results are yielded in input order, otherwise each chunk
+        is yielded as soon as it finishes
+
+    engine(str)
+        'bitmask', 'dlx' or 'sat' to solve the grids one at a time with ``solve``, or
+        'numpy' to propagate each chunk as one batch with ``vecboard``
+
+    Yields
+    ------
+    tuple
+        (grid, solution) pairs, where solution is the solved grid string, None
+        if the puzzle has no solution, or ``INVALID`` if the grid is malformed
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1, got {}".format(chunksize))
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1, got {}".format(workers))
+    if engine not in ENGINES:
+        raise ValueError("Unknown engine {!r}; choose from {}".format(engine, ENGINES))
+    if engine == 'numpy' and vecboard.np is None:
+        raise ImportError("the 'numpy' engine requires NumPy (pip install numpy)")
+    return _solve_many(grids, workers, chunksize, ordered, engine)
+
+
+def _solve_many(grids, workers, chunksize, ordered, engine):
+    chunks = _chunks(grids, chunksize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, engine)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    limit = IN_FLIGHT * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque() if ordered else set()
+        submit = pending.append if ordered else pending.add
+        for chunk in chunks:
+            submit(pool.submit(_solve_chunk, chunk, engine))
+            if len(pending) < limit:
+                continue
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                submit = pending.add
+                for future in done:
+                    yield from future.result()
+        if ordered:
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+
+def read_grids(lines):
+    """Yield the grid on each line, skipping blank lines and '#' comments
+
+    Both '.' and '0' are accepted as the marker for an empty box.
+    """
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line.replace('0', '.')
+
+
+def main(args):
+    infile = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        results = solve_many(read_grids(infile), workers=args.processes,
+                             chunksize=args.chunksize, ordered=not args.unordered,
+                             engine=args.engine)
+        for grid, solution in results:
+            print(grid, solution or '-')
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Solve a stream of diagonal Sudoku puzzles in parallel.",
+        epilog=textwrap.dedent("""\
+            Each input line holds one 81-character grid ('.' or '0' for empty boxes).
+            Each output line holds the input grid and its solution, '-' if the
+            puzzle has no solution, or 'invalid' if the line is not a valid grid.
+
+            Example Usage:
+            --------------
+            - Solve a puzzle file with 4 processes, printing results as they finish:
+
+                $python batch.py puzzles.txt -p 4 --unordered > solutions.txt
+
+            - Validate a large puzzle set with the NumPy engine, 2048 grids per batch:
+
+                $python batch.py puzzles.txt -e numpy -c 2048
+
+            - Solve puzzles piped in on stdin:
+
+                $cat puzzles.txt | python batch.py
+        """)
+    )
+    parser.add_argument(
+        'input', nargs='?', default='-',
+        help="Read grids from this file ('-' or omitted for stdin)."
+    )
+    parser.add_argument(
+        '-p', '--processes', type=int, default=None,
+        help="Set the number of worker processes (defaults to the number of CPUs)."
+    )
+    parser.add_argument(
+        '-c', '--chunksize', type=int, default=CHUNKSIZE,
+        help="Set the number of grids sent to a worker in each task."
+    )
+    parser.add_argument(
+        '-u', '--unordered', action="store_true",
+        help="Print solutions as soon as they finish instead of in input order."
+    )
+    parser.add_argument(
+        '-e', '--engine', choices=ENGINES, default='bitmask',
+        help="Select the solver engine ('numpy' propagates each chunk as one batch)."
+    )
+    args = parser.parse_args()
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+    if args.processes is not None and args.processes < 1:
+        parser.error("--processes must be at least 1")
+    main(args)
@@ -0,0 +1,276 @@
+"""Time the Sudoku solvers over the bundled puzzle corpora.
+
+Each corpus in ``puzzles/`` is a text file with one grid per line. A
+``# variant: <name>`` header line names the variant its grids belong to, and
+other '#' lines are comments. For every corpus the benchmark reports:
+
+- ``solve``: puzzles/sec through ``solution.solve`` for each engine (the
+  'numpy' engine solves the whole corpus as one ``vecboard`` batch), and for
+  the bitmask engine the search nodes, propagation passes and backtracks
+  counted by ``bitboard.SearchStats``, both for the default heuristics and for
+  every pair of ``bitboard.SELECTIONS`` and ``bitboard.ORDERINGS``
+- ``reduce_puzzle`` and ``naked_twins``: calls/sec of the propagation
+  routines on the unsolved grids
+- the peak memory allocated while solving, measured with ``tracemalloc`` in
+  a separate pass so the tracing does not skew the timings
+- optionally, a ``bitboard.Profile`` of the bitmask solves: the calls, time
+  and candidates eliminated of each propagation strategy and the branching
+  factor of the search, also measured in a separate pass
+
+The report is printed as a table and can be written out as JSON to compare
+engines or catch regressions between commits.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import textwrap
+import time
+import tracemalloc
+
+import bitboard
+import variants
+import vecboard
+from solution import solve
+
+
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'puzzles')
+ENGINES = ('bitmask', 'dlx', 'sat', 'numpy')
+DEFAULT_ENGINES = ENGINES if vecboard.np is not None else ('bitmask', 'dlx', 'sat')
+DEFAULT_VARIANT = 'diagonal'
+
+
+def corpus_paths(directory=PUZZLE_DIR):
+    """Return the paths of the corpora bundled in directory, sorted by name"""
+    return sorted(glob.glob(os.path.join(directory, '*.txt')))
+
+
+def load_corpus(path):
+    """Read a corpus file
+
+    Parameters
+    ----------
+    path(str)
+        the corpus file to read
+
+    Returns
+    -------
+    tuple
+        (variant, grids), where variant is the name given by the
+        ``# variant:`` header (``DEFAULT_VARIANT`` if there is none) and grids
+        is the list of grid strings, with '0' markers replaced by '.'
+    """
+    variant, grids = DEFAULT_VARIANT, []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#'):
+                key, _, value = line[1:].partition(':')
+                if key.strip() == 'variant':
+                    variant = value.strip()
+            elif line:
+                grids.append(line.replace('0', '.'))
+    return variant, grids
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds else float('inf')
+
+
+def _time(function, items, repeat):
+    """Return the best time over repeat runs of function on every item"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _peak_memory(function, items):
+    """Return the peak number of bytes allocated while running function on every item"""
+    tracemalloc.start()
+    try:
+        for item in items:
+            function(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _search_stats(grids, tables, heuristics=None):
+    stats = bitboard.SearchStats()
+    for grid in grids:
+        bitboard.search(bitboard.grid2board(grid, tables), tables, stats=stats, heuristics=heuristics)
+    return stats.as_dict()
+
+
+def _heuristic_stats(grids, tables):
+    """Return the search counters for every pair of branching heuristics"""
+    return {'{}/{}'.format(select, order):
+            _search_stats(grids, tables, bitboard.heuristics(select, order))
+            for select in bitboard.SELECTIONS for order in bitboard.ORDERINGS}
+
+
+def _profile(grids, tables):
+    profile = bitboard.Profile()
+    for grid in grids:
+        bitboard.search(bitboard.grid2board(grid, tables), tables, profile=profile)
+    return profile.as_dict()
+
+
+def bench_corpus(path, engines=DEFAULT_ENGINES, repeat=1, profile=False):
+    """Benchmark one corpus, returning its section of the report (see run_benchmark)"""
+    variant, grids = load_corpus(path)
+    tables = variants.get_tables(variant)
+    boards = [bitboard.grid2board(grid, tables) for grid in grids]
+
+    result = {'variant': variant, 'puzzles': len(grids), 'solve': {}}
+    for engine in engines:
+        if engine == 'numpy':
+            def run(batch):
+                return vecboard.solve_grids(batch, tables)
+            items = [grids]
+        else:
+            def run(grid):
+                return solve(grid, variant, engine)
+            items = grids
+        seconds = _time(run, items, repeat)
+        entry = {'seconds': seconds, 'puzzles_per_sec': _rate(len(grids), seconds),
+                 'peak_memory': _peak_memory(run, items)}
+        if engine == 'bitmask':
+            entry.update(_search_stats(grids, tables))
+            entry['heuristics'] = _heuristic_stats(grids, tables)
+        result['solve'][engine] = entry
+
+    for name in ('reduce_puzzle', 'naked_twins'):
+        routine = getattr(bitboard, name)
+        seconds = _time(lambda board: routine(list(board), tables), boards, repeat)
+        result[name] = {'seconds': seconds, 'calls_per_sec': _rate(len(boards), seconds)}
+    if profile:
+        result['profile'] = _profile(grids, tables)
+    return result
+
+
+def run_benchmark(paths=None, engines=DEFAULT_ENGINES, repeat=1, profile=False):
+    """Benchmark the solvers over a list of corpora
+
+    Parameters
+    ----------
+    paths(list or None)
+        the corpus files to run (defaults to every corpus in ``puzzles/``)
+
+    engines(iterable)
+        the ``solve`` engines to time (by default 'numpy' is included only
+        when NumPy is installed)
+
+    repeat(int)
+        the number of timing runs; the fastest is reported
+
+    profile(bool)
+        add a ``profile`` section to each corpus (see ``bitboard.Profile``)
+
+    Returns
+    -------
+    dict
+        the report: the Python version and platform, and one section per
+        corpus keyed by its file name
+    """
+    if paths is None:
+        paths = corpus_paths()
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpora': {os.path.basename(path): bench_corpus(path, engines, repeat, profile)
+                    for path in paths},
+    }
+
+
+def format_report(report):
+    """Return the report as a plain-text table"""
+    lines = ['{:<14}{:<15}{:>8}{:>12}{:>10}{:>12}{:>12}'.format(
+        'corpus', 'engine', 'puzzles', 'puzzles/s', 'nodes', 'propagate', 'peak KiB')]
+    for name, corpus in report['corpora'].items():
+        for engine, entry in corpus['solve'].items():
+            lines.append('{:<14}{:<15}{:>8}{:>12.1f}{:>10}{:>12}{:>12.1f}'.format(
+                name, engine, corpus['puzzles'], entry['puzzles_per_sec'],
+                entry.get('nodes', '-'), entry.get('propagations', '-'),
+                entry['peak_memory'] / 1024))
+        for routine in ('reduce_puzzle', 'naked_twins'):
+            lines.append('{:<14}{:<15}{:>8}{:>12.1f}'.format(
+                name, routine, corpus['puzzles'], corpus[routine]['calls_per_sec']))
+    lines.append('')
+    lines.append('{:<14}{:<24}{:>10}{:>12}'.format('corpus', 'heuristics', 'nodes', 'backtracks'))
+    for name, corpus in report['corpora'].items():
+        for pair, stats in corpus['solve'].get('bitmask', {}).get('heuristics', {}).items():
+            lines.append('{:<14}{:<24}{:>10}{:>12}'.format(name, pair, stats['nodes'], stats['backtracks']))
+    profiled = [(name, corpus['profile']) for name, corpus in report['corpora'].items() if 'profile' in corpus]
+    if profiled:
+        lines.append('')
+        lines.append('{:<14}{:<15}{:>10}{:>12}{:>12}{:>12}'.format(
+            'corpus', 'strategy', 'calls', 'ms', 'eliminated', 'branching'))
+        for name, profile in profiled:
+            for strategy, entry in profile['strategies'].items():
+                lines.append('{:<14}{:<15}{:>10}{:>12.1f}{:>12}'.format(
+                    name, strategy, entry['calls'], entry['seconds'] * 1000, entry['eliminated']))
+            lines.append('{:<14}{:<15}{:>10}{:>12}{:>12}{:>12.2f}'.format(
+                name, 'search', profile['search']['branch_points'], '', '',
+                profile['search']['branching_factor']))
+    return '\n'.join(lines)
+
+
+def main(args):
+    report = run_benchmark(args.corpora or None, args.engines, args.repeat, args.profile)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Benchmark the Sudoku solvers over graded puzzle corpora.",
+        epilog=textwrap.dedent("""\
+            Example Usage:
+            --------------
+            - Benchmark every bundled corpus and save the report:
+
+                $python benchmark.py -o baseline.json
+
+            - Time only the dancing links engine on the hard corpus, best of 5:
+
+                $python benchmark.py puzzles/hard.txt -e dlx -r 5
+
+            - Report the work done by each propagation strategy:
+
+                $python benchmark.py -e bitmask --profile
+        """)
+    )
+    parser.add_argument(
+        'corpora', nargs='*',
+        help="Corpus files to run (defaults to every file in puzzles/)."
+    )
+    parser.add_argument(
+        '-e', '--engines', nargs='+', choices=ENGINES, default=list(DEFAULT_ENGINES),
+        help="Select the solve engines to time."
+    )
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=1,
+        help="Set the number of timing runs; the fastest is reported."
+    )
+    parser.add_argument(
+        '--profile', action="store_true",
+        help="Report the calls, time and eliminations of each propagation strategy."
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help="Write the report to this file as JSON."
+    )
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    main(args)
@@ -0,0 +1,932 @@
+"""Bitmask board representation for the Sudoku solver.
+
+A board is a flat list with one integer per box. Bit ``d`` of a box mask is set
+when the digit ``tables.symbols[d]`` is still a candidate for that box, so a
+solved box has exactly one bit set and an empty mask is a contradiction. All of
+the unit and peer relationships are stored as tuples of box indices so the hot
+loops only ever index into lists.
+
+The dictionary representation used by the rest of the project remains the
+boundary format: use ``values2board`` and ``board2values`` (or ``grid2board``)
+to move between the two.
+"""
+import json
+import time
+from array import array
+from collections import OrderedDict, namedtuple
+from itertools import combinations
+
+
+Tables = namedtuple('Tables', ['size', 'symbols', 'boxes', 'units', 'peers', 'box_units'])
+Tables.__doc__ = """Index-based unit and peer tables for one Sudoku layout
+
+    size(int)
+        the number of candidate digits per box (9 for the classic board)
+
+    symbols(str)
+        the character used for each digit; bit ``d`` of a mask is ``symbols[d]``
+
+    boxes(tuple)
+        the box names (e.g., 'A1') in board order
+
+    units(tuple)
+        a tuple of units, each a tuple of box indices
+
+    peers(tuple)
+        for each box index, a tuple of the indices of its peers
+
+    box_units(tuple)
+        for each box index, a tuple of the indices (into units) of its member units
+"""
+
+
+def build_tables(unitlist, boxes, symbols='123456789'):
+    """Build the index tables for a board from its list of units
+
+    Parameters
+    ----------
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    symbols(str)
+        the characters used for the digits, in bit order
+
+    Returns
+    -------
+    Tables
+        the index-based unit and peer tables for the board
+    """
+    index = {box: i for i, box in enumerate(boxes)}
+    units = tuple(tuple(index[box] for box in unit) for unit in unitlist)
+    box_units = [[] for _ in boxes]
+    for u, unit in enumerate(units):
+        for i in unit:
+            box_units[i].append(u)
+    peers = []
+    for i, member_units in enumerate(box_units):
+        members = {j for u in member_units for j in units[u]}
+        members.discard(i)
+        peers.append(tuple(sorted(members)))
+    return Tables(len(symbols), symbols, tuple(boxes), units, tuple(peers),
+                  tuple(tuple(u) for u in box_units))
+
+
+def values2board(values, tables):
+    """Convert the dictionary board representation to a list of candidate masks
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    tables(Tables)
+        the index tables for the board
+
+    Returns
+    -------
+    list
+        one candidate bitmask per box, in board order
+    """
+    bit = {s: 1 << d for d, s in enumerate(tables.symbols)}
+    board = []
+    for box in tables.boxes:
+        mask = 0
+        for digit in values[box]:
+            mask |= bit[digit]
+        board.append(mask)
+    return board
+
+
+def board2values(board, tables):
+    """Convert a list of candidate masks to the dictionary board representation
+
+    Parameters
+    ----------
+    board(list)
+        one candidate bitmask per box, in board order
+
+    tables(Tables)
+        the index tables for the board
+
+    Returns
+    -------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    symbols = tables.symbols
+    values = {}
+    for box, mask in zip(tables.boxes, board):
+        values[box] = ''.join(s for d, s in enumerate(symbols) if mask >> d & 1)
+    return values
+
+
+def grid2board(grid, tables):
+    """Convert a grid string directly into a list of candidate masks
+
+    Any character that is not one of ``tables.symbols`` marks an empty box.
+    """
+    full = (1 << tables.size) - 1
+    bit = {s: 1 << d for d, s in enumerate(tables.symbols)}
+    return [bit.get(c, full) for c in grid]
+
+
+def board2grid(board, tables):
+    """Convert a list of candidate masks to a grid string ('.' for unsolved boxes)"""
+    symbols = tables.symbols
+    return ''.join(symbols[m.bit_length() - 1] if m and not m & (m - 1) else '.'
+                   for m in board)
+
+
+def is_solved(board):
+    """Return True if every box has exactly one candidate"""
+    return all(m and not m & (m - 1) for m in board)
+
+
+def eliminate(board, tables):
+    """Remove the digit of every solved box from the candidates of its peers
+
+    Input: A sudoku as a list of candidate masks.
+    Output: The same list, updated in place.
+    """
+    peers = tables.peers
+    for i, mask in enumerate(board):
+        if mask and not mask & (mask - 1):
+            keep = ~mask
+            for p in peers[i]:
+                board[p] &= keep
+    return board
+
+
+def only_choice(board, tables):
+    """Assign every digit that fits in only one box of a unit to that box
+
+    Input: A sudoku as a list of candidate masks.
+    Output: The same list, updated in place.
+    """
+    for unit in tables.units:
+        once = twice = 0
+        for i in unit:
+            mask = board[i]
+            twice |= once & mask
+            once |= mask
+        single = once & ~twice
+        if single:
+            for i in unit:
+                mask = board[i] & single
+                if mask:
+                    board[i] = mask
+    return board
+
+
+def naked_twins(board, tables):
+    """Eliminate values using the naked twins strategy.
+
+    Twins are found from the input board and the eliminations are applied to a
+    copy, so every pair of twins in the original input is processed.
+
+    Input: A sudoku as a list of candidate masks.
+    Output: A new list with the naked twins eliminated from the rest of their units.
+    """
+    out = list(board)
+    for unit in tables.units:
+        pairs = {}
+        for i in unit:
+            mask = board[i]
+            rest = mask & (mask - 1)
+            if rest and not rest & (rest - 1):
+                if mask in pairs:
+                    keep = ~mask
+                    twin = pairs[mask]
+                    for j in unit:
+                        if j != i and j != twin:
+                            out[j] &= keep
+                else:
+                    pairs[mask] = i
+    return out
+
+
+def _eliminate_box(board, tables, i, trail, solved, dirty):
+    """Remove the digit of the solved box ``i`` from the candidates of its peers"""
+    mask = board[i]
+    keep = ~mask
+    box_units = tables.box_units
+    for p in tables.peers[i]:
+        old = board[p]
+        if old & mask:
+            new = old & keep
+            if not new:
+                return False
+            if trail is not None:
+                trail.append((p, old))
+            board[p] = new
+            dirty.update(box_units[p])
+            if not new & (new - 1):
+                solved.append(p)
+    return True
+
+
+def _unit_only_choice(board, tables, u, trail, solved, dirty):
+    """Assign every digit that fits in only one box of unit ``u`` to that box"""
+    unit = tables.units[u]
+    once = twice = 0
+    for i in unit:
+        mask = board[i]
+        twice |= once & mask
+        once |= mask
+    if once != (1 << tables.size) - 1:
+        return False
+    single = once & ~twice
+    if single:
+        for i in unit:
+            old = board[i]
+            new = old & single
+            if new and new != old:
+                if new & (new - 1):
+                    return False
+                if trail is not None:
+                    trail.append((i, old))
+                board[i] = new
+                dirty.update(tables.box_units[i])
+                solved.append(i)
+    return True
+
+
+def _remove(board, tables, boxes, mask, trail, solved, dirty):
+    """Remove the digits in ``mask`` from each of ``boxes``; False if one runs out"""
+    keep = ~mask
+    for j in boxes:
+        old = board[j]
+        if old & mask:
+            new = old & keep
+            if not new:
+                return False
+            if trail is not None:
+                trail.append((j, old))
+            board[j] = new
+            dirty.update(tables.box_units[j])
+            if not new & (new - 1):
+                solved.append(j)
+    return True
+
+
+def _unit_naked_twins(board, tables, u, trail, solved, dirty):
+    """Eliminate the digits of any naked twins in unit ``u`` from the rest of the unit
+
+    Two-candidate boxes are grouped by their mask in a single pass, so every
+    pair of twins in the unit is found without comparing boxes pairwise.
+    """
+    unit = tables.units[u]
+    pairs = {}
+    for i in unit:
+        mask = board[i]
+        rest = mask & (mask - 1)
+        if rest and not rest & (rest - 1):
+            if mask not in pairs:
+                pairs[mask] = i
+                continue
+            twin = pairs[mask]
+            others = [j for j in unit if j != i and j != twin]
+            if not _remove(board, tables, others, mask, trail, solved, dirty):
+                return False
+    return True
+
+
+def _naked_subsets(board, tables, u, k, trail, solved, dirty):
+    """Eliminate the digits of any k boxes of unit ``u`` that share exactly k candidates"""
+    unit = tables.units[u]
+    open_boxes = [i for i in unit if board[i] & (board[i] - 1)]
+    if len(open_boxes) <= k:
+        return True
+    small = [i for i in open_boxes if bin(board[i]).count('1') <= k]
+    for subset in combinations(small, k):
+        union = 0
+        for i in subset:
+            union |= board[i]
+        if bin(union).count('1') == k:
+            others = [j for j in open_boxes if j not in subset]
+            if not _remove(board, tables, others, union, trail, solved, dirty):
+                return False
+    return True
+
+
+def _unit_naked_triples(board, tables, u, trail, solved, dirty):
+    """Eliminate the digits of any naked triples in unit ``u`` from the rest of the unit"""
+    return _naked_subsets(board, tables, u, 3, trail, solved, dirty)
+
+
+def _unit_naked_quads(board, tables, u, trail, solved, dirty):
+    """Eliminate the digits of any naked quads in unit ``u`` from the rest of the unit"""
+    return _naked_subsets(board, tables, u, 4, trail, solved, dirty)
+
+
+def _unit_hidden_pairs(board, tables, u, trail, solved, dirty):
+    """Restrict any two boxes that hold the only places for two digits of unit ``u``
+
+    The boxes that can hold each digit are collected as a position mask, and
+    digits are grouped by position mask in a single pass.
+    """
+    unit = tables.units[u]
+    where = [0] * tables.size
+    for pos, i in enumerate(unit):
+        mask = board[i]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            where[bit.bit_length() - 1] |= 1 << pos
+    pairs = {}
+    for digit, positions in enumerate(where):
+        rest = positions & (positions - 1)
+        if not rest or rest & (rest - 1):
+            continue
+        if positions not in pairs:
+            pairs[positions] = digit
+            continue
+        keep = 1 << digit | 1 << pairs[positions]
+        boxes = [unit[pos] for pos in range(len(unit)) if positions >> pos & 1]
+        if not _remove(board, tables, boxes, ~keep, trail, solved, dirty):
+            return False
+    return True
+
+
+STRATEGIES = {
+    'only_choice': _unit_only_choice,
+    'naked_twins': _unit_naked_twins,
+    'naked_triples': _unit_naked_triples,
+    'naked_quads': _unit_naked_quads,
+    'hidden_pairs': _unit_hidden_pairs,
+}
+
+# the unit strategies applied by propagate() unless a caller selects others
+unit_strategies = [_unit_only_choice, _unit_naked_twins, _unit_hidden_pairs]
+
+
+def strategies(*names):
+    """Return the unit strategies with the given names (see ``STRATEGIES``)"""
+    return [STRATEGIES[name] for name in names]
+
+
+def propagate(board, tables, changed, trail=None, strategies=None, profile=None, conflict=None):
+    """Propagate constraints outward from the boxes whose candidates changed
+
+    Only the peers of newly solved boxes and the units of changed boxes are
+    revisited, so the cost of a call scales with the amount of change rather
+    than with the size of the board.
+
+    Parameters
+    ----------
+    board(list)
+        one candidate bitmask per box, updated in place
+
+    tables(Tables)
+        the index tables for the board
+
+    changed(iterable)
+        the indices of the boxes whose candidates changed since the board was
+        last propagated (every box, for a fresh board)
+
+    trail(list or None)
+        if given, an ``(index, old_mask)`` pair is appended for every change
+        so that the caller can undo it later
+
+    strategies(list or None)
+        the unit strategies to apply to each changed unit (see ``strategies()``);
+        defaults to ``unit_strategies``
+
+    profile(Profile or None)
+        if given, the peer elimination and each unit strategy are timed and
+        counted (see ``Profile``)
+
+    conflict(list or None)
+        if given, the index of the unit whose constraint failed is appended
+        when a contradiction is found
+
+    Returns
+    -------
+    list or False
+        The board, or False if a contradiction was found
+    """
+    if strategies is None:
+        strategies = unit_strategies
+    eliminate_box = _eliminate_box
+    if profile is not None:
+        eliminate_box, strategies = profile.instrument(strategies)
+    box_units = tables.box_units
+    solved = []
+    dirty = set()
+    for i in changed:
+        mask = board[i]
+        if not mask:
+            if conflict is not None:
+                conflict.append(box_units[i][0])
+            return False
+        if not mask & (mask - 1):
+            solved.append(i)
+        dirty.update(box_units[i])
+    while solved or dirty:
+        if solved:
+            i = solved.pop()
+            if not eliminate_box(board, tables, i, trail, solved, dirty):
+                if conflict is not None:
+                    conflict.append(_elimination_conflict(board, tables, i))
+                return False
+            continue
+        u = dirty.pop()
+        for strategy in strategies:
+            if not strategy(board, tables, u, trail, solved, dirty):
+                if conflict is not None:
+                    conflict.append(u)
+                return False
+    return board
+
+
+def _elimination_conflict(board, tables, i):
+    """Return a unit shared by the solved box i and the peer its elimination emptied
+
+    The peer is left with exactly the digit of box i, which it would lose.
+    """
+    mask = board[i]
+    for p in tables.peers[i]:
+        if board[p] == mask:
+            for u in tables.box_units[i]:
+                if p in tables.units[u]:
+                    return u
+    return tables.box_units[i][0]
+
+
+def reduce_puzzle(board, tables, strategies=None, profile=None):
+    """Apply eliminate and the unit strategies (by default only choice, naked
+    twins and hidden pairs) until the board stalls
+
+    Input: A sudoku as a list of candidate masks.
+    Output: The reduced board, or False if a contradiction was found.
+    """
+    return propagate(board, tables, range(len(board)), strategies=strategies, profile=profile)
+
+
+def undo(board, trail, mark):
+    """Restore every box changed since the trail had ``mark`` entries"""
+    while len(trail) > mark:
+        i, old = trail.pop()
+        board[i] = old
+
+
+class PropagationCache:
+    """A bounded LRU cache of propagation results, shared across searches
+
+    Boards are keyed on their layout (the units of their tables) and their
+    candidate masks packed into bytes, so boards of different variants never
+    share an entry even when they have the same number of boxes. An entry
+    holds either the ``reduce_puzzle`` result for the board or a dead-end
+    verdict: the board has no solution, either because propagation found a
+    contradiction or because a search exhausted every branch below it. Pass
+    the same cache to many ``search`` calls to skip the propagation of starting
+    boards and the subtrees already proven empty in earlier puzzles.
+
+    Within one layout a reduction only removes candidates that cannot be part
+    of a solution and a dead end has no solution, so the entries may be reused
+    by searches that use different unit strategies.
+
+    Parameters
+    ----------
+    maxsize(int)
+        the number of entries kept; the least recently used one is evicted
+    """
+    DEAD = False
+
+    def __init__(self, maxsize=65536):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1, got {}".format(maxsize))
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.layouts = {}  # id(tables) -> (tables, layout number)
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.layouts.clear()
+        self.hits = self.misses = 0
+
+    def key(self, board, tables):
+        """Return the compact encoding of a board and its layout used as its cache key"""
+        try:
+            layout = self.layouts[id(tables)][1]
+        except KeyError:
+            numbers = {t.units: n for t, n in self.layouts.values()}
+            layout = numbers.get(tables.units, len(numbers))
+            self.layouts[id(tables)] = (tables, layout)  # holding tables keeps its id unique
+        return layout, array('H' if max(board) < 1 << 16 else 'L', board).tobytes()
+
+    def _get(self, key):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def reduce(self, board, tables, strategies=None, profile=None):
+        """Return ``reduce_puzzle`` of a copy of board, computing it only on a cache miss"""
+        key = self.key(board, tables)
+        value = self._get(key)
+        if value is None:
+            value = reduce_puzzle(list(board), tables, strategies, profile)
+            self._put(key, value if value is False else tuple(value))
+        return value if value is False else list(value)
+
+    def is_dead(self, key):
+        """Return True if the board with this key is known to have no solution"""
+        return self._get(key) is self.DEAD
+
+    def mark_dead(self, key):
+        self._put(key, self.DEAD)
+
+
+class SearchStats:
+    """Counters filled in by a search when passed as its ``stats`` argument
+
+    ``nodes`` counts the branches tried, ``propagations`` the calls to
+    ``propagate`` (including the initial reduction) and ``backtracks`` the
+    branches whose propagation hit a contradiction.
+    """
+    __slots__ = ('nodes', 'propagations', 'backtracks')
+
+    def __init__(self):
+        self.nodes = self.propagations = self.backtracks = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _removed(board, trail, mark):
+    """Return the number of candidates removed by the trail entries after mark"""
+    removed = 0
+    after = {}
+    for i, old in reversed(trail[mark:]):
+        removed += bin(old).count('1') - bin(after.get(i, board[i])).count('1')
+        after[i] = old
+    return removed
+
+
+class Profile:
+    """Opt-in counters for the propagation strategies and the search branching
+
+    Pass a Profile as the ``profile`` argument of ``propagate``,
+    ``reduce_puzzle``, ``search`` or ``count_solutions`` to record, for peer
+    elimination ('eliminate') and for each unit strategy, the number of calls,
+    the time spent in them and the number of candidates they removed, and for
+    the search the number of branch points and the candidates tried at them.
+    The strategies are only wrapped when a profile is given, so the solver runs
+    its usual code with no counting at all when profiling is off.
+
+    One profile may be passed to many calls to total their counts.
+    """
+    def __init__(self):
+        self.counters = {}  # [calls, seconds, eliminated] by strategy name
+        self.branch_points = self.branches = 0
+        self._instrumented = {}
+
+    def _wrap(self, strategy, name):
+        counter = self.counters.setdefault(name, [0, 0.0, 0])
+        clock = time.perf_counter
+
+        def instrumented(board, tables, u, trail, solved, dirty):
+            log = [] if trail is None else trail
+            mark = len(log)
+            start = clock()
+            ok = strategy(board, tables, u, log, solved, dirty)
+            counter[1] += clock() - start
+            counter[0] += 1
+            if len(log) > mark:
+                counter[2] += _removed(board, log, mark)
+                if trail is None:
+                    log.clear()
+            return ok
+        return instrumented
+
+    def instrument(self, strategies):
+        """Return the counting versions of peer elimination and of the unit strategies"""
+        key = tuple(strategies)
+        if key not in self._instrumented:
+            names = {function: name for name, function in STRATEGIES.items()}
+            self._instrumented[key] = (
+                self._wrap(_eliminate_box, 'eliminate'),
+                [self._wrap(strategy, names.get(strategy, strategy.__name__))
+                 for strategy in strategies])
+        return self._instrumented[key]
+
+    def branch(self, candidates):
+        """Record a branch point of the search with this many candidates to try"""
+        self.branch_points += 1
+        self.branches += candidates
+
+    def as_dict(self):
+        """Return the counters as a dictionary of plain numbers
+
+        ``strategies`` maps each strategy name to its ``calls``, ``seconds``
+        and ``eliminated`` candidates, and ``search`` holds the
+        ``branch_points``, ``branches`` and their mean, the ``branching_factor``.
+        """
+        return {
+            'strategies': {name: {'calls': calls, 'seconds': seconds, 'eliminated': eliminated}
+                           for name, (calls, seconds, eliminated) in self.counters.items()},
+            'search': {
+                'branch_points': self.branch_points,
+                'branches': self.branches,
+                'branching_factor': self.branches / self.branch_points if self.branch_points else 0.0,
+            },
+        }
+
+    def to_json(self, **kwargs):
+        """Return the counters as a JSON string (keyword arguments go to ``json.dumps``)"""
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+def search(board, tables, trail=None, strategies=None, stats=None, cache=None, heuristics=None,
+           profile=None):
+    """Using depth-first search and propagation, try all possible values.
+
+    The search works on a single board in place: every change is recorded on
+    an undo trail, and backtracking restores only the boxes that changed.
+
+    Input: A sudoku as a list of candidate masks, and optionally a list that
+    receives the trail. When the search succeeds the trail holds exactly the
+    changes on the path to the solution (see ``assignments``). ``strategies``
+    selects the unit strategies used for propagation, and a ``SearchStats``
+    passed as ``stats`` is updated with the work done. A ``PropagationCache``
+    passed as ``cache`` supplies and records reductions and dead ends; the
+    initial reduction is looked up only when no trail is requested.
+    ``heuristics`` picks the branching box and the order its candidates are
+    tried in (see ``heuristics()``), and a ``Profile`` passed as ``profile``
+    records the work of each strategy and the branching of the search.
+    Output: The solved board (the same list), or False if there is no solution.
+    """
+    if trail is None:
+        if cache is None:
+            board = reduce_puzzle(board, tables, strategies, profile)
+        else:
+            board = cache.reduce(board, tables, strategies, profile)
+        trail = []
+    else:
+        board = propagate(board, tables, range(len(board)), trail, strategies, profile)
+    if stats is not None:
+        stats.propagations += 1
+    if board is False:
+        return False
+    if _search(board, tables, trail, strategies, stats, cache, heuristics, profile):
+        return board
+    return False
+
+
+def assignments(board, trail, tables):
+    """Return the (box, value) steps that solved ``board``, in the order they were made
+
+    A box is considered assigned by the last change recorded for it on the trail.
+    """
+    last = {}
+    for pos, (i, _) in enumerate(trail):
+        last[i] = pos
+    symbols = tables.symbols
+    return [(tables.boxes[i], symbols[board[i].bit_length() - 1])
+            for i in sorted(last, key=last.get)
+            if not board[i] & (board[i] - 1)]
+
+
+def count_solutions(board, tables, limit=2, strategies=None, stats=None, cache=None,
+                    heuristics=None, profile=None):
+    """Count the solutions of a board, stopping as soon as ``limit`` are found
+
+    The input board is not modified. Siblings in the search share one board and
+    undo trail, so each branch only re-propagates what its own choice changed.
+
+    Input: A sudoku as a list of candidate masks, and the number of solutions
+    after which to stop counting (None to count them all).
+    Output: The number of solutions found, at most ``limit``.
+    """
+    if limit is not None and limit <= 0:
+        return 0
+    if cache is None:
+        board = reduce_puzzle(list(board), tables, strategies, profile)
+    else:
+        board = cache.reduce(board, tables, strategies, profile)
+    if stats is not None:
+        stats.propagations += 1
+    if board is False:
+        return 0
+    count = 0
+    for _ in _solutions(board, tables, [], strategies, stats, cache, heuristics, profile):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+def _search(board, tables, trail, strategies=None, stats=None, cache=None, heuristics=None,
+            profile=None):
+    """Depth-first search over an already propagated board
+
+    Returns True with the board solved, or False with the board restored to
+    its input state.
+    """
+    for _ in _solutions(board, tables, trail, strategies, stats, cache, heuristics, profile):
+        return True
+    return False
+
+
+class _Buckets:
+    """The unsolved boxes of a board grouped by their number of candidates
+
+    The buckets are kept in step with the undo trail: ``sync`` re-buckets only
+    the boxes changed since the last call and ``undo`` re-buckets only the
+    boxes it restores, so choosing the box with the fewest candidates costs
+    time proportional to the change since the previous node rather than to the
+    size of the board.
+
+    ``weights`` holds one failure weight per unit for the dom/wdeg heuristic:
+    the number of contradictions the unit caused during the search, plus one.
+    """
+    def __init__(self, board, tables, trail):
+        self.weights = [1] * len(tables.units)
+        self.count = [bin(m).count('1') for m in board]
+        self.buckets = [set() for _ in range(tables.size + 1)]
+        for i, count in enumerate(self.count):
+            if count > 1:
+                self.buckets[count].add(i)
+        self.synced = len(trail)
+
+    def _move(self, i, mask):
+        count = bin(mask).count('1')
+        old = self.count[i]
+        if count != old:
+            if old > 1:
+                self.buckets[old].discard(i)
+            if count > 1:
+                self.buckets[count].add(i)
+            self.count[i] = count
+
+    def sync(self, board, trail):
+        for i, _ in trail[self.synced:]:
+            self._move(i, board[i])
+        self.synced = len(trail)
+
+    def undo(self, board, trail, mark):
+        """Like ``undo()``, re-bucketing each restored box"""
+        while len(trail) > mark:
+            i, old = trail.pop()
+            board[i] = old
+            self._move(i, old)
+        self.synced = min(self.synced, mark)
+
+    def fewest(self):
+        """Return an unsolved box with the fewest candidates, or None if all are solved"""
+        for bucket in self.buckets[2:]:
+            if bucket:
+                return next(iter(bucket))
+        return None
+
+    def fail(self, u):
+        """Record that the constraint of unit u failed during propagation"""
+        self.weights[u] += 1
+
+
+def _select_mrv(board, tables, buckets):
+    """Minimum remaining values: any box with the fewest candidates"""
+    return buckets.fewest()
+
+
+def _select_mrv_degree(board, tables, buckets):
+    """Minimum remaining values, breaking ties by the most unsolved peers"""
+    count, peers = buckets.count, tables.peers
+    for bucket in buckets.buckets[2:]:
+        if bucket:
+            return max(bucket, key=lambda i: sum(1 for p in peers[i] if count[p] > 1))
+    return None
+
+
+def _select_domwdeg(board, tables, buckets):
+    """dom/wdeg: the fewest candidates per unit of failure weight"""
+    count, weights, box_units = buckets.count, buckets.weights, tables.box_units
+    best, best_score = None, None
+    for bucket in buckets.buckets[2:]:
+        for i in bucket:
+            score = count[i] / sum(weights[u] for u in box_units[i])
+            if best is None or score < best_score:
+                best, best_score = i, score
+    return best
+
+
+def _order_ascending(board, tables, i):
+    """Try the candidates in digit order"""
+    mask, bits = board[i], []
+    while mask:
+        bit = mask & -mask
+        bits.append(bit)
+        mask ^= bit
+    return bits
+
+
+def _order_lcv(board, tables, i):
+    """Least constraining value: try first the candidates shared by the fewest peers"""
+    peers = tables.peers[i]
+    return sorted(_order_ascending(board, tables, i),
+                  key=lambda bit: sum(1 for p in peers if board[p] & bit))
+
+
+SELECTIONS = {
+    'mrv': _select_mrv,
+    'mrv_degree': _select_mrv_degree,
+    'domwdeg': _select_domwdeg,
+}
+
+ORDERINGS = {
+    'ascending': _order_ascending,
+    'lcv': _order_lcv,
+}
+
+Heuristics = namedtuple('Heuristics', ['select', 'order'])
+Heuristics.__doc__ = """The branching heuristics of a search
+
+    select(function)
+        ``select(board, tables, buckets)`` returns the box to branch on, or
+        None when every box is solved (see ``SELECTIONS``)
+
+    order(function)
+        ``order(board, tables, i)`` returns the candidate bits of box i in the
+        order to try them (see ``ORDERINGS``)
+"""
+
+
+def heuristics(select='mrv', order='ascending'):
+    """Return the search heuristics with the given names (see ``SELECTIONS`` and ``ORDERINGS``)"""
+    return Heuristics(SELECTIONS[select], ORDERINGS[order])
+
+
+default_heuristics = heuristics()
+
+
+def _solutions(board, tables, trail, strategies=None, stats=None, cache=None, heuristics=None,
+               profile=None):
+    """Yield the board each time the depth-first search solves it
+
+    Each stack frame holds the branching box, the candidates still to try (last
+    to try first), the
+    trail length to restore before trying the next one, and (with a cache) the
+    key of the board at the frame and the number of solutions found before it.
+    A frame that is exhausted without finding a solution marks its board dead
+    in the cache, and boards already marked dead are not branched on. Resuming
+    the generator backtracks from the yielded solution to look for the next
+    one; once the search is exhausted the board is back in its input state.
+    """
+    select, order = heuristics or default_heuristics
+    buckets = _Buckets(board, tables, trail)
+    stack = []
+    found = 0
+    while True:
+        buckets.sync(board, trail)
+        i = select(board, tables, buckets)
+        if i is None:
+            found += 1
+            yield board
+        else:
+            key = None if cache is None else cache.key(board, tables)
+            if key is None or not cache.is_dead(key):
+                bits = order(board, tables, i)
+                if profile is not None:
+                    profile.branch(len(bits))
+                stack.append([i, bits[::-1], len(trail), key, found])
+        while stack:
+            frame = stack[-1]
+            i, bits, mark, key, before = frame
+            buckets.undo(board, trail, mark)
+            if not bits:
+                stack.pop()
+                if key is not None and found == before:
+                    cache.mark_dead(key)
+                continue
+            bit = bits.pop()
+            trail.append((i, board[i]))
+            board[i] = bit
+            if stats is not None:
+                stats.nodes += 1
+                stats.propagations += 1
+            conflict = []
+            if propagate(board, tables, (i,), trail, strategies, profile, conflict) is not False:
+                break
+            buckets.fail(conflict[0])
+            if stats is not None:
+                stats.backtracks += 1
+        else:
+            return
@@ -0,0 +1,165 @@
+"""Dancing links (Knuth's Algorithm X) exact-cover engine for Sudoku.
+
+Every (box, digit) candidate is a row of the exact-cover matrix. The columns
+are one "box is filled" constraint per box plus one "digit appears in unit"
+constraint per (unit, digit) pair, so any unit in the variant tables -- including
+the diagonals -- is encoded the same way as the rows, columns and squares. The
+matrix is stored as a toroidal doubly-linked list held in flat integer lists.
+"""
+
+
+class DancingLinks:
+    """The exact-cover matrix for one board
+
+    Parameters
+    ----------
+    board(list)
+        one candidate bitmask per box; only the candidates left in each mask
+        become rows of the matrix
+
+    tables(bitboard.Tables)
+        the index tables for the board
+    """
+    def __init__(self, board, tables):
+        n = tables.size
+        n_boxes = len(board)
+        n_columns = n_boxes + len(tables.units) * n
+        # node 0 is the root; nodes 1..n_columns are the column headers
+        self.L = [c - 1 for c in range(n_columns + 1)]
+        self.R = [c + 1 for c in range(n_columns + 1)]
+        self.L[0], self.R[n_columns] = n_columns, 0
+        self.U = list(range(n_columns + 1))
+        self.D = list(range(n_columns + 1))
+        self.C = list(range(n_columns + 1))
+        self.S = [0] * (n_columns + 1)
+        self.rows = [None] * (n_columns + 1)
+        self.tables = tables
+
+        for i, mask in enumerate(board):
+            for d in range(n):
+                if mask >> d & 1:
+                    columns = [1 + i] + [1 + n_boxes + u * n + d for u in tables.box_units[i]]
+                    self._add_row((i, d), columns)
+
+    def _add_row(self, row, columns):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        first = len(C)
+        for k, c in enumerate(columns):
+            node = first + k
+            L.append(node - 1 if k else first + len(columns) - 1)
+            R.append(node + 1 if k < len(columns) - 1 else first)
+            U.append(U[c])
+            D.append(c)
+            C.append(c)
+            D[U[c]] = node
+            U[c] = node
+            S[c] += 1
+            self.rows.append(row)
+
+    def _cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def _choose_column(self):
+        """Return the uncovered column with the fewest rows"""
+        R, S = self.R, self.S
+        best, size = 0, None
+        c = R[0]
+        while c:
+            if size is None or S[c] < size:
+                best, size = c, S[c]
+                if size <= 1:
+                    break
+            c = R[c]
+        return best
+
+    def covers(self):
+        """Yield every exact cover as a list of (box index, digit) rows
+
+        The search is iterative: the stack holds the row chosen at each level,
+        and each row's column is recovered from the node itself on backtrack.
+        """
+        R, L, D, C = self.R, self.L, self.D, self.C
+        stack = []
+        while True:
+            if not R[0]:
+                yield [self.rows[r] for r in stack]
+            else:
+                c = self._choose_column()
+                if self.S[c]:
+                    self._cover(c)
+                    r = D[c]
+                    j = R[r]
+                    while j != r:
+                        self._cover(C[j])
+                        j = R[j]
+                    stack.append(r)
+                    continue
+            # backtrack to the deepest level that still has a row to try
+            while stack:
+                r = stack.pop()
+                c = C[r]
+                j = L[r]
+                while j != r:
+                    self._uncover(C[j])
+                    j = L[j]
+                r = D[r]
+                if r != c:
+                    j = R[r]
+                    while j != r:
+                        self._cover(C[j])
+                        j = R[j]
+                    stack.append(r)
+                    break
+                self._uncover(c)
+            else:
+                return
+
+
+def solutions(board, tables):
+    """Yield every solution of a board as a new list of single-candidate masks
+
+    Parameters
+    ----------
+    board(list)
+        one candidate bitmask per box
+
+    tables(bitboard.Tables)
+        the index tables for the board
+    """
+    for cover in DancingLinks(board, tables).covers():
+        solved = [0] * len(board)
+        for i, d in cover:
+            solved[i] = 1 << d
+        yield solved
+
+
+def search(board, tables):
+    """Return the first solution of a board found by dancing links, or False"""
+    for solved in solutions(board, tables):
+        return solved
+    return False
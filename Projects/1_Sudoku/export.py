@@ -0,0 +1,232 @@
+"""Render solver traces to files without a display.
+
+The board is drawn on an offscreen pygame surface with the cached squares of
+``PySudoku.Board``, and every assignment of ``reconstruct(result, history)`` is
+written out as soon as it is drawn, so no more than one frame is ever held in
+memory. Two outputs are supported:
+
+- an animated PNG (APNG), written by a small streaming encoder: the first
+  frame holds the whole board and each later frame holds only the square that
+  changed, drawn over the previous frame
+- a directory of numbered PNG frames, for feeding to an external video encoder
+
+APNG is used rather than GIF because it is lossless (no palette quantization
+of the anti-aliased digits), needs only ``zlib`` to encode, and supports the
+partial frames that keep the files small.
+"""
+import argparse
+import os
+import struct
+import textwrap
+import zlib
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # render without a window
+import pygame
+
+import PySudoku
+from solution import solve
+from utils import grid2values, history, reconstruct
+
+
+FPS = 5
+HOLD = 2  # seconds to show the solved board at the end of an animation
+SIZE = (700, 700)
+BACKGROUND = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images', 'sudoku-board-bare.jpg')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def _pixels(surface, rect):
+    """Return the zlib-compressed PNG scanlines of an area of the surface"""
+    raw = pygame.image.tobytes(surface.subsurface(rect), 'RGB')
+    stride = rect.width * 3
+    return zlib.compress(b''.join(b'\x00' + raw[i:i + stride] for i in range(0, len(raw), stride)))
+
+
+def write_png(path, surface):
+    """Write surface to path as a still PNG"""
+    width, height = surface.get_size()
+    with open(path, 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(_chunk(b'IDAT', _pixels(surface, surface.get_rect())))
+        f.write(_chunk(b'IEND', b''))
+
+
+class APNGWriter:
+    """Stream frames into an animated PNG file
+
+    Parameters
+    ----------
+    f(file)
+        the binary file to write to
+
+    size(tuple)
+        the (width, height) of the animation
+
+    n_frames(int)
+        the number of frames that will be added (APNG declares it up front)
+
+    loop(int)
+        the number of times to play the animation (0 loops forever)
+    """
+    def __init__(self, f, size, n_frames, loop=0):
+        self.f = f
+        self.size = size
+        self.sequence = 0
+        self.frames = 0
+        self.n_frames = n_frames
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', size[0], size[1], 8, 2, 0, 0, 0)))
+        f.write(_chunk(b'acTL', struct.pack('>II', n_frames, loop)))
+
+    def add_frame(self, surface, rect=None, delay=(1, FPS)):
+        """Write an area of surface (all of it by default) as the next frame
+
+        The first frame must cover the whole image. Later frames are drawn over
+        the previous one, so they only need to cover what changed.
+
+        delay is the (numerator, denominator) of the frame duration in seconds.
+        """
+        if self.frames == self.n_frames:
+            raise ValueError("the animation was declared with {} frames".format(self.n_frames))
+        rect = pygame.Rect((0, 0), self.size) if rect is None else pygame.Rect(rect)
+        if not self.frames and rect.size != self.size:
+            raise ValueError("the first frame must cover the whole image")
+        self.f.write(_chunk(b'fcTL', struct.pack('>IIIIIHHBB', self.sequence, rect.width, rect.height,
+                                                 rect.x, rect.y, delay[0], delay[1], 0, 0)))
+        self.sequence += 1
+        data = _pixels(surface, rect)
+        if self.frames:
+            self.f.write(_chunk(b'fdAT', struct.pack('>I', self.sequence) + data))
+            self.sequence += 1
+        else:
+            self.f.write(_chunk(b'IDAT', data))
+        self.frames += 1
+
+    def close(self):
+        if self.frames != self.n_frames:
+            raise ValueError("{} of {} frames were written".format(self.frames, self.n_frames))
+        self.f.write(_chunk(b'IEND', b''))
+
+
+def replay(values, assignments):
+    """Yield (surface, rect) for each frame of a replay drawn offscreen
+
+    The first frame is the starting board and each later one applies the
+    next assignment; rect is the area that changed since the previous frame.
+    The same surface is yielded every time, so consume each frame before
+    asking for the next one.
+    """
+    pygame.font.init()
+    surface = pygame.Surface(SIZE)
+    board = PySudoku.Board(surface, pygame.image.load(BACKGROUND), values)
+    yield surface, board.draw()
+    for box, value in assignments:
+        yield surface, board.assign(box, value)
+
+
+def export_apng(path, values, result, history, fps=FPS, loop=0):
+    """Write the replay of a solver trace as an animated PNG
+
+    Parameters
+    ----------
+    path(str)
+        the file to write
+
+    values(dict)
+        the starting board, in the form {'box_name': '123456789', ...}
+
+    result(dict)
+        the solved board
+
+    history(History or dict)
+        the trace recorded while solving (see ``utils.reconstruct``)
+
+    fps(int)
+        the number of assignments shown per second
+
+    loop(int)
+        the number of times to play the animation (0 loops forever)
+    """
+    assignments = reconstruct(result, history)
+    n_frames = len(assignments) + 1
+    with open(path, 'wb') as f:
+        writer = APNGWriter(f, SIZE, n_frames, loop)
+        for k, (surface, rect) in enumerate(replay(dict(values), assignments), 1):
+            writer.add_frame(surface, rect, (HOLD, 1) if k == n_frames else (1, fps))
+        writer.close()
+    return n_frames
+
+
+def export_frames(directory, values, result, history):
+    """Write each frame of the replay of a solver trace as a numbered PNG file
+
+    Returns the number of frames written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    n_frames = 0
+    for surface, _ in replay(dict(values), reconstruct(result, history)):
+        write_png(os.path.join(directory, 'frame{:05d}.png'.format(n_frames)), surface)
+        n_frames += 1
+    return n_frames
+
+
+def main(args):
+    values = grid2values(args.grid)
+    history.start()
+    result = solve(args.grid, engine=args.engine)
+    history.stop()
+    if not result:
+        raise SystemExit("The puzzle has no solution")
+    if args.frames:
+        n_frames = export_frames(args.output, values, result, history)
+    else:
+        n_frames = export_apng(args.output, values, result, history, args.fps)
+    print("Wrote {} frames to {}".format(n_frames, args.output))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Solve a diagonal Sudoku and render the solver trace without a display.",
+        epilog=textwrap.dedent("""\
+            Example Usage:
+            --------------
+            - Write an animated PNG at 10 assignments per second:
+
+                $python export.py 2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3 -o solve.png --fps 10
+
+            - Write numbered PNG frames and encode them with ffmpeg:
+
+                $python export.py <grid> -o frames --frames
+                $ffmpeg -i frames/frame%05d.png solve.mp4
+        """)
+    )
+    parser.add_argument(
+        'grid',
+        help="The 81-character puzzle to solve ('.' for empty boxes)."
+    )
+    parser.add_argument(
+        '-o', '--output', required=True,
+        help="Write the animation to this file (or the frames to this directory)."
+    )
+    parser.add_argument(
+        '--frames', action="store_true",
+        help="Write numbered PNG frames instead of an animated PNG."
+    )
+    parser.add_argument(
+        '--fps', type=int, default=FPS,
+        help="Set the number of assignments shown per second of animation."
+    )
+    parser.add_argument(
+        '-e', '--engine', choices=('bitmask', 'dlx'), default='bitmask',
+        help="Select the solver engine whose trace is rendered."
+    )
+    args = parser.parse_args()
+    if args.fps < 1:
+        parser.error("--fps must be at least 1")
+    main(args)
@@ -0,0 +1,317 @@
+"""Generate Sudoku puzzles with unique solutions and grade their difficulty.
+
+A puzzle is carved from a random solved grid by removing clues one at a time
+in random order. Removing a clue keeps the solution unique exactly when no
+solution exists with that box holding a different digit, so each removal is
+checked with a single search on the remaining clues with the old digit struck
+from the box. The candidates left by the clues are kept up to date as clues
+are removed, and a check propagates only from the boxes it changes and then
+undoes them, so a contradiction usually shows up after a few boxes rather
+than after reducing the whole board. A clue whose removal fails is kept for
+good: taking away more clues can only add solutions.
+
+The difficulty of a puzzle is the weakest level of propagation that solves it
+(see ``LEVELS``); puzzles that none of them solve need branching and are
+graded by the number of search nodes.
+
+    >>> from solution import count_solutions
+    >>> puzzle = generate(seed=1)
+    >>> count_solutions(puzzle.grid, variant='diagonal')
+    1
+"""
+import argparse
+import random
+import textwrap
+from collections import namedtuple
+
+import bitboard
+import variants
+
+
+# the propagation levels used to grade a puzzle, from weakest to strongest
+LEVELS = (
+    ('easy', ('only_choice',)),
+    ('medium', ('only_choice', 'naked_twins')),
+    ('hard', tuple(bitboard.STRATEGIES)),
+)
+BRANCHING = 'expert'  # the grade of puzzles that need search
+GRADES = tuple(name for name, _ in LEVELS) + (BRANCHING,)
+# the uniqueness checks mostly end in a quick contradiction, which the cheapest
+# strategies find as fast as the strong ones
+CHECK_STRATEGIES = ('only_choice',)
+
+Grade = namedtuple('Grade', ['level', 'strategies', 'nodes'])
+Grade.__doc__ = """The difficulty of a puzzle
+
+    level(str)
+        one of ``GRADES``
+
+    strategies(tuple)
+        the unit strategies of the weakest level that solves the puzzle
+        (those of the strongest level if it needs branching)
+
+    nodes(int)
+        the number of search nodes needed on top of those strategies
+"""
+
+Puzzle = namedtuple('Puzzle', ['grid', 'solution', 'clues', 'grade'])
+
+
+def _random_solution(tables, rng):
+    """Return a random solved board, or None if the random seeding was contradictory"""
+    full = (1 << tables.size) - 1
+    board = [full] * len(tables.boxes)
+    for i in rng.sample(range(len(board)), tables.size):
+        candidates = [1 << d for d in range(tables.size) if board[i] >> d & 1]
+        if not candidates:
+            return None
+        board[i] = rng.choice(candidates)
+        if bitboard.propagate(board, tables, (i,)) is False:
+            return None
+    board = bitboard.search(board, tables)
+    if board is False:
+        return None
+    # relabel the digits so every symbol is equally likely in every box
+    relabel = list(range(tables.size))
+    rng.shuffle(relabel)
+    return [1 << relabel[m.bit_length() - 1] for m in board]
+
+
+class _ClueBoard:
+    """The candidates left by the clues of a solved board as clues are removed
+
+    ``board`` holds each clue's digit and, in every other box, the digits that
+    no clue among its peers holds; ``counts[i][d]`` is the number of clues
+    among the peers of box i that hold digit d. Removing a clue only touches
+    its peers, and a uniqueness check changes the board through the undo
+    trail and restores it afterwards, so no check rebuilds or re-reduces the
+    whole board.
+    """
+    def __init__(self, solution, tables):
+        self.tables = tables
+        self.full = (1 << tables.size) - 1
+        self.solution = list(solution)
+        self.clues = list(solution)
+        self.board = list(solution)
+        self.counts = [[0] * tables.size for _ in solution]
+        self.heuristics = bitboard.Heuristics(bitboard.SELECTIONS['domwdeg'], self._order)
+        for i, mask in enumerate(solution):
+            d = mask.bit_length() - 1
+            for j in tables.peers[i]:
+                self.counts[j][d] += 1
+
+    def _order(self, board, tables, i):
+        """Try the digit of the known solution first
+
+        Another solution usually differs from the known one in only a few
+        boxes, so following the known solution finds it after little search.
+        """
+        mask, first = board[i], self.solution[i]
+        rest = [1 << d for d in range(tables.size) if mask >> d & 1 and 1 << d != first]
+        return [first] + rest if mask & first else rest
+
+    def _free(self, i):
+        """Return the digits of box i held by no clue among its peers"""
+        count = self.counts[i]
+        return self.full & ~sum(1 << d for d in range(self.tables.size) if count[d])
+
+    def remove(self, i):
+        """Remove the clue in box i"""
+        mask, self.clues[i] = self.clues[i], 0
+        d = mask.bit_length() - 1
+        for j in self.tables.peers[i]:
+            self.counts[j][d] -= 1
+            if not self.clues[j] and not self.counts[j][d]:
+                self.board[j] |= mask
+        self.board[i] = self._free(i)
+
+    def has_other_solution(self, i, strategies):
+        """Return True if the clues without the one in box i allow a solution where box i changes"""
+        board, tables, clues = self.board, self.tables, self.clues
+        mask = clues[i]
+        d = mask.bit_length() - 1
+        trail = []
+        changed = [i]
+        trail.append((i, mask))
+        board[i] = self._free(i) & ~mask
+        for j in tables.peers[i]:
+            if not clues[j] and self.counts[j][d] == 1:
+                trail.append((j, board[j]))
+                board[j] |= mask
+                changed.append(j)
+        # boxes left with one candidate by the clues have not been propagated yet
+        changed += [j for j, m in enumerate(board) if not clues[j] and m and not m & (m - 1)]
+        found = (bitboard.propagate(board, tables, changed, trail, strategies) is not False
+                 and bitboard._search(board, tables, trail, strategies, heuristics=self.heuristics))
+        bitboard.undo(board, trail, 0)
+        return found
+
+
+def carve(solution, tables, rng, min_clues=0, strategies=None):
+    """Remove clues from a solved board for as long as the solution stays unique
+
+    Parameters
+    ----------
+    solution(list)
+        a solved board (one single-bit mask per box)
+
+    tables(bitboard.Tables)
+        the index tables for the board
+
+    rng(random.Random)
+        the source of the removal order
+
+    min_clues(int)
+        stop carving once only this many clues are left
+
+    strategies(list or None)
+        the unit strategies used for the uniqueness checks (defaults to
+        ``CHECK_STRATEGIES``)
+
+    Returns
+    -------
+    list
+        the clue masks, with 0 for the boxes that were emptied
+    """
+    if strategies is None:
+        strategies = bitboard.strategies(*CHECK_STRATEGIES)
+    clues = _ClueBoard(solution, tables)
+    n_clues = len(solution)
+    order = list(range(n_clues))
+    rng.shuffle(order)
+    for i in order:
+        if n_clues <= min_clues:
+            break
+        if not clues.has_other_solution(i, strategies):
+            clues.remove(i)
+            n_clues -= 1
+    return clues.clues
+
+
+def grade_board(board, tables):
+    """Grade a board with a unique solution (see ``Grade``)"""
+    for level, names in LEVELS:
+        reduced = bitboard.reduce_puzzle(list(board), tables, bitboard.strategies(*names))
+        if reduced is not False and bitboard.is_solved(reduced):
+            return Grade(level, names, 0)
+    stats = bitboard.SearchStats()
+    bitboard.search(list(board), tables, strategies=bitboard.strategies(*names), stats=stats)
+    return Grade(BRANCHING, names, stats.nodes)
+
+
+def grade(grid, variant='diagonal'):
+    """Grade a puzzle given as a grid string (see ``Grade``)"""
+    tables = variants.get_tables(variant)
+    return grade_board(bitboard.grid2board(grid, tables), tables)
+
+
+def generate(variant='diagonal', seed=None, min_clues=0):
+    """Generate one puzzle with a unique solution
+
+    Parameters
+    ----------
+    variant(str)
+        the name of the Sudoku variant (see ``variants.variant_names()``)
+
+    seed(int, random.Random or None)
+        a seed or random source, for reproducible puzzles
+
+    min_clues(int)
+        stop carving once only this many clues are left
+
+    Returns
+    -------
+    Puzzle
+        the puzzle and solution grid strings, the number of clues and the grade
+    """
+    tables = variants.get_tables(variant)
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    solution = None
+    while solution is None:
+        solution = _random_solution(tables, rng)
+    clues = carve(solution, tables, rng, min_clues)
+    full = (1 << tables.size) - 1
+    board = [m or full for m in clues]
+    return Puzzle(bitboard.board2grid(board, tables), bitboard.board2grid(solution, tables),
+                  sum(1 for m in clues if m), grade_board(board, tables))
+
+
+def generate_many(count, variant='diagonal', seed=None, levels=None, min_clues=0):
+    """Yield ``count`` puzzles, keeping only those whose grade is in ``levels``
+
+    Parameters
+    ----------
+    count(int)
+        the number of puzzles to yield
+
+    levels(iterable or None)
+        the accepted grades (see ``GRADES``); None accepts every grade
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    levels = set(GRADES if levels is None else levels)
+    unknown = levels - set(GRADES)
+    if unknown:
+        raise ValueError("Unknown grades {}; choose from {}".format(sorted(unknown), GRADES))
+    while count > 0:
+        puzzle = generate(variant, rng, min_clues)
+        if puzzle.grade.level in levels:
+            count -= 1
+            yield puzzle
+
+
+def main(args):
+    print('# variant: {}'.format(args.variant))
+    for puzzle in generate_many(args.count, args.variant, args.seed, args.grades, args.min_clues):
+        if not args.quiet:
+            print('# {} clues, {}, {} nodes'.format(puzzle.clues, puzzle.grade.level, puzzle.grade.nodes))
+        print(puzzle.grid)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Generate graded Sudoku puzzles with unique solutions.",
+        epilog=textwrap.dedent("""\
+            The output is a puzzle corpus: a '# variant:' header followed by one
+            grid per line, each preceded by a comment with its clue count, grade
+            and search nodes unless --quiet is given.
+
+            Example Usage:
+            --------------
+            - Generate 100 diagonal puzzles that need naked twins or more:
+
+                $python generator.py -n 100 -g medium hard expert > puzzles.txt
+
+            - Generate a reproducible classic corpus for the benchmark:
+
+                $python generator.py -n 50 -v classic -s 7 -q > puzzles/classic.txt
+        """)
+    )
+    parser.add_argument(
+        '-n', '--count', type=int, default=10,
+        help="Set the number of puzzles to generate."
+    )
+    parser.add_argument(
+        '-v', '--variant', default='diagonal', choices=variants.variant_names(),
+        help="Select the Sudoku variant."
+    )
+    parser.add_argument(
+        '-g', '--grades', nargs='+', choices=GRADES, default=None,
+        help="Keep only puzzles with these grades."
+    )
+    parser.add_argument(
+        '-m', '--min-clues', type=int, default=0,
+        help="Stop carving once only this many clues are left."
+    )
+    parser.add_argument(
+        '-s', '--seed', type=int, default=None,
+        help="Seed the random generator for reproducible output."
+    )
+    parser.add_argument(
+        '-q', '--quiet', action="store_true",
+        help="Print only the grids."
+    )
+    args = parser.parse_args()
+    if args.count < 0:
+        parser.error("--count must not be negative")
+    main(args)
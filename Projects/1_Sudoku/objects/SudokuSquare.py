@@ -2,6 +2,26 @@ import pygame
 
 from pygame import *
 
+# rendered surfaces shared by every square, so redrawing never re-renders them
+_fonts = {}
+_glyphs = {}
+_tiles = {}
+
+
+def get_font(name='opensans', size=21):
+    """Return the font, loading it on first use"""
+    if (name, size) not in _fonts:
+        _fonts[name, size] = pygame.font.SysFont(name, size)
+    return _fonts[name, size]
+
+
+def render_glyph(number, color=(255, 255, 255)):
+    """Return the rendered text for a number, rendering it on first use"""
+    if (number, color) not in _glyphs:
+        _glyphs[number, color] = get_font().render(number, 1, color)
+    return _glyphs[number, color]
+
+
 def AAfilledRoundedRect(surface,rect,color,radius=0.4):
 
     """
@@ -13,12 +33,27 @@ def AAfilledRoundedRect(surface,rect,color,radius=0.4):
     radius  : 0 <= radius <= 1
     """
 
-    rect         = Rect(rect)
+    rect = Rect(rect)
+    key  = (rect.size, tuple(color), radius)
+    if key not in _tiles:
+        _tiles[key] = roundedRectSurface(rect.size, color, radius)
+    return surface.blit(_tiles[key], rect.topleft)
+
+
+def roundedRectSurface(size,color,radius=0.4):
+
+    """
+    roundedRectSurface(size,color,radius=0.4) -> Surface
+
+    size    : (width, height)
+    color   : rgb or rgba
+    radius  : 0 <= radius <= 1
+    """
+
+    rect         = Rect((0,0),size)
     color        = Color(*color)
     alpha        = color.a
     color.a      = 0
-    pos          = rect.topleft
-    rect.topleft = 0,0
     rectangle    = Surface(rect.size,SRCALPHA)
 
     circle       = Surface([min(rect.size)*3]*2,SRCALPHA)
@@ -39,7 +74,7 @@ def AAfilledRoundedRect(surface,rect,color,radius=0.4):
     rectangle.fill(color,special_flags=BLEND_RGBA_MAX)
     rectangle.fill((255,255,255,alpha),special_flags=BLEND_RGBA_MIN)
 
-    return surface.blit(rectangle,pos)
+    return rectangle
 
 class SudokuSquare:
     """A sudoku square class."""
@@ -51,8 +86,8 @@ class SudokuSquare:
             number = ""
             self.color = (255, 255, 255)
         # print("FONTS", pygame.font.get_fonts())
-        self.font = pygame.font.SysFont('opensans', 21)
-        self.text = self.font.render(number, 1, (255, 255, 255))
+        self.font = get_font()
+        self.text = render_glyph(number)
         self.textpos = self.text.get_rect()
         self.textpos = self.textpos.move(offsetX + 17, offsetY + 4)
 
@@ -70,12 +105,29 @@ class SudokuSquare:
         self.offsetX = offsetX
         self.offsetY = offsetY
 
-    def draw(self):
-        screen = pygame.display.get_surface()
-        AAfilledRoundedRect(screen, (self.offsetX, self.offsetY, 45, 40), self.color)
+    def draw(self, surface=None):
+        """Draw the square on surface (the display by default) and return the area it covers"""
+        screen = surface or pygame.display.get_surface()
+        area = AAfilledRoundedRect(screen, (self.offsetX, self.offsetY, 45, 40), self.color)
 
         # screen.blit(self.collide, self.collideRect)
-        screen.blit(self.text, self.textpos)
+        return area.union(screen.blit(self.text, self.textpos))
+
+
+    def rect(self):
+        """Return the area the square covers when drawn"""
+        return Rect(self.offsetX, self.offsetY, 45, 40).union(self.textpos)
+
+
+    def setNumber(self, number):
+        """Show number (None for an empty square) without redrawing"""
+        if number != None:
+            self.text = render_glyph(str(number))
+            self.color = (2, 204, 186)
+        else:
+            self.text = render_glyph("")
+            self.color = (255, 255, 255)
+        self.textpos = self.text.get_rect().move(self.offsetX + 17, self.offsetY + 4)
 
 
     def checkCollide(self, collision):
@@ -104,7 +156,7 @@ class SudokuSquare:
             number = ""
         
         if self.edit == "Y":
-            self.text = self.font.render(number, 1, (0, 0, 0))
+            self.text = render_glyph(number, (0, 0, 0))
             self.draw()
             return 0
         else:
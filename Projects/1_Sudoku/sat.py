@@ -0,0 +1,410 @@
+"""SAT encoding and a clause-learning (CDCL) solver for Sudoku.
+
+Every (box, digit) candidate left in a board is a boolean variable, numbered
+from 1 in board order, and the rules become clauses of DIMACS-style integer
+literals (``v`` for "box holds digit", ``-v`` for its negation):
+
+- every box holds at least one of its candidates, and no two of them
+- every digit appears in every unit at least once, and no more than once
+
+Only the candidates still in the masks become variables, so encoding a board
+after ``bitboard.reduce_puzzle`` gives a formula far smaller than the full
+n**3 variable encoding -- which is what makes 25x25 boards practical. Any
+unit in the variant tables, including the diagonals, is encoded the same way.
+
+The solver works on flat integer clause lists rather than ``Expr`` trees: two
+watched literals per clause for unit propagation, first-UIP conflict analysis
+with clause learning and non-chronological backjumping, VSIDS variable
+activities kept in a lazy heap, phase saving, and Luby restarts. ``dimacs``
+writes an encoding out for comparison with external solvers.
+"""
+import argparse
+import heapq
+import sys
+import textwrap
+from collections import namedtuple
+from itertools import combinations
+
+import bitboard
+import variants
+
+
+RESTART_BASE = 100  # conflicts in the first restart interval (scaled by the Luby sequence)
+VAR_DECAY = 0.95
+
+Encoding = namedtuple('Encoding', ['n_vars', 'clauses', 'candidates'])
+Encoding.__doc__ = """The CNF encoding of a board
+
+    n_vars(int)
+        the number of variables
+
+    clauses(list)
+        the clauses, each a list of non-zero integer literals
+
+    candidates(list)
+        the (box index, digit) pair of each variable; variable ``v`` is
+        ``candidates[v - 1]``
+"""
+
+
+def encode(board, tables):
+    """Encode the candidates left in a board as CNF
+
+    Parameters
+    ----------
+    board(list)
+        one candidate bitmask per box
+
+    tables(bitboard.Tables)
+        the index tables for the board
+
+    Returns
+    -------
+    Encoding
+        the variables and clauses; a digit with no candidate left in some
+        unit gives an empty clause, so the formula is unsatisfiable
+    """
+    n = tables.size
+    candidates = []
+    var = {}
+    clauses = []
+    for i, mask in enumerate(board):
+        box = []
+        for d in range(n):
+            if mask >> d & 1:
+                candidates.append((i, d))
+                var[i, d] = len(candidates)
+                box.append(len(candidates))
+        clauses.append(box)
+        clauses.extend([-a, -b] for a, b in combinations(box, 2))
+    for unit in tables.units:
+        for d in range(n):
+            places = [var[i, d] for i in unit if (i, d) in var]
+            clauses.append(places)
+            clauses.extend([-a, -b] for a, b in combinations(places, 2))
+    return Encoding(len(candidates), clauses, candidates)
+
+
+def decode(model, encoding, n_boxes):
+    """Return the board of n_boxes single-candidate masks described by a model"""
+    board = [0] * n_boxes
+    for v, (i, d) in enumerate(encoding.candidates, 1):
+        if model[v]:
+            board[i] = 1 << d
+    return board
+
+
+def dimacs(encoding, comments=()):
+    """Return the encoding in DIMACS CNF format
+
+    Each comment line maps a variable back to its candidate, e.g.
+    ``c 1 = box 0 digit 3``, after any extra comment lines given.
+    """
+    lines = ['c {}'.format(comment) for comment in comments]
+    lines.extend('c {} = box {} digit {}'.format(v, i, d)
+                 for v, (i, d) in enumerate(encoding.candidates, 1))
+    lines.append('p cnf {} {}'.format(encoding.n_vars, len(encoding.clauses)))
+    lines.extend(' '.join(map(str, clause + [0])) for clause in encoding.clauses)
+    return '\n'.join(lines) + '\n'
+
+
+def _luby(k):
+    """Return the k-th term (from 1) of the Luby restart sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size = 1
+    while size < k + 1:
+        size = 2 * size + 1
+    while size - 1 != k:
+        size = (size - 1) // 2
+        k %= size
+    return (size + 1) // 2
+
+
+class Solver:
+    """A CDCL solver over integer clauses
+
+    Internally literal ``v`` is stored as ``2 * v`` and ``-v`` as ``2 * v + 1``,
+    so negation is ``lit ^ 1`` and every per-literal table is a flat list.
+
+    Parameters
+    ----------
+    n_vars(int)
+        the number of variables, numbered from 1
+
+    clauses(iterable)
+        the clauses, each an iterable of non-zero DIMACS-style literals
+    """
+    def __init__(self, n_vars, clauses):
+        self.n_vars = n_vars
+        self.value = [0] * (2 * n_vars + 2)  # 1 true, -1 false, 0 unassigned, by literal
+        self.level = [0] * (n_vars + 1)
+        self.reason = [None] * (n_vars + 1)
+        self.phase = [1] * (n_vars + 1)  # the saved polarity of each variable (1 for negative)
+        self.activity = [0.0] * (n_vars + 1)
+        self.var_inc = 1.0
+        self.heap = [(0.0, v) for v in range(1, n_vars + 1)]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.clauses = []
+        self.watches = [[] for _ in range(2 * n_vars + 2)]
+        self.conflicts = self.decisions = self.propagations = 0
+        self.ok = True
+        for clause in clauses:
+            lits = sorted({2 * lit if lit > 0 else -2 * lit + 1 for lit in clause})
+            if any(lit ^ 1 in lits for lit in lits):
+                continue  # a tautology
+            if not lits:
+                self.ok = False
+            elif len(lits) == 1:
+                if self.value[lits[0]] == -1:
+                    self.ok = False
+                elif not self.value[lits[0]]:
+                    self._assign(lits[0], None)
+            else:
+                self._add_clause(lits)
+
+    def _add_clause(self, lits):
+        index = len(self.clauses)
+        self.clauses.append(lits)
+        self.watches[lits[0]].append(index)
+        self.watches[lits[1]].append(index)
+        return index
+
+    def _assign(self, lit, reason):
+        v = lit >> 1
+        self.value[lit] = 1
+        self.value[lit ^ 1] = -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """Propagate the assignments on the trail; return a conflicting clause index or None"""
+        value, clauses, watches, trail = self.value, self.clauses, self.watches, self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            ws = watches[false_lit]
+            i = j = 0
+            end = len(ws)
+            while i < end:
+                index = ws[i]
+                i += 1
+                clause = clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if value[first] == 1:
+                    ws[j] = index
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if value[lit] != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(index)
+                        break
+                else:
+                    ws[j] = index
+                    j += 1
+                    if value[first] == -1:
+                        ws[j:] = ws[i:end]
+                        self.qhead = len(trail)
+                        return index
+                    self._assign(first, index)
+            del ws[j:]
+        return None
+
+    def _bump(self, v):
+        activity = self.activity
+        activity[v] += self.var_inc
+        if activity[v] > 1e100:
+            for u in range(1, self.n_vars + 1):
+                activity[u] *= 1e-100
+            self.var_inc *= 1e-100
+            self.heap = [(-activity[u], u) for u in range(1, self.n_vars + 1)
+                         if not self.value[2 * u]]
+            heapq.heapify(self.heap)
+        elif not self.value[2 * v]:
+            heapq.heappush(self.heap, (-activity[v], v))
+
+    def _analyze(self, conflict):
+        """Return the first-UIP learnt clause and the level to backjump to"""
+        level, reason, trail = self.level, self.reason, self.trail
+        current = len(self.trail_lim)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        while True:
+            clause = self.clauses[conflict]
+            for q in (clause if lit is None else clause[1:]):
+                v = q >> 1
+                if v not in seen and level[v] > 0:
+                    seen.add(v)
+                    self._bump(v)
+                    if level[v] == current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while trail[index] >> 1 not in seen:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            conflict = reason[lit >> 1]
+            pending -= 1
+            if not pending:
+                break
+        learnt[0] = lit ^ 1
+        # drop the literals implied by the rest of the clause
+        learnt[1:] = [q for q in learnt[1:] if not self._redundant(q, seen)]
+        back = 0
+        if len(learnt) > 1:
+            k = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+            learnt[1], learnt[k] = learnt[k], learnt[1]
+            back = level[learnt[1] >> 1]
+        return learnt, back
+
+    def _redundant(self, q, seen):
+        """Return True if q is implied by literals already in the learnt clause"""
+        reason = self.reason[q >> 1]
+        if reason is None:
+            return False
+        level = self.level
+        return all(r >> 1 in seen or not level[r >> 1] for r in self.clauses[reason][1:])
+
+    def _backjump(self, target):
+        if len(self.trail_lim) <= target:
+            return
+        mark = self.trail_lim[target]
+        value, activity, heap = self.value, self.activity, self.heap
+        for lit in self.trail[mark:]:
+            v = lit >> 1
+            value[lit] = value[lit ^ 1] = 0
+            self.reason[v] = None
+            self.phase[v] = lit & 1
+            heapq.heappush(heap, (-activity[v], v))
+        del self.trail[mark:]
+        del self.trail_lim[target:]
+        self.qhead = len(self.trail)
+
+    def _decide(self):
+        """Return the unassigned variable with the highest activity, or None"""
+        heap, value, activity = self.heap, self.value, self.activity
+        while heap:
+            negative, v = heapq.heappop(heap)
+            if not value[2 * v] and -negative == activity[v]:
+                return v
+        return None
+
+    def solve(self):
+        """Return a model as a list of booleans indexed by variable, or False if unsatisfiable"""
+        if not self.ok or self._propagate() is not None:
+            self.ok = False
+            return False
+        restart = 1
+        budget = RESTART_BASE * _luby(restart)
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, back = self._analyze(conflict)
+                self._backjump(back)
+                self._assign(learnt[0], self._add_clause(learnt) if len(learnt) > 1 else None)
+                self.var_inc /= VAR_DECAY
+                budget -= 1
+                continue
+            if budget <= 0:
+                restart += 1
+                budget = RESTART_BASE * _luby(restart)
+                self._backjump(0)
+                continue
+            v = self._decide()
+            if v is None:
+                return [False] + [self.value[2 * v] == 1 for v in range(1, self.n_vars + 1)]
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self._assign(2 * v + self.phase[v], None)
+
+
+def satisfiable(n_vars, clauses):
+    """Return a model of integer clauses (see ``Solver.solve``), or False"""
+    return Solver(n_vars, clauses).solve()
+
+
+def search(board, tables):
+    """Return the solution of a board found by the SAT solver, or False
+
+    The board is propagated first so that only the candidates left after
+    ``bitboard.reduce_puzzle`` are encoded; the input board is not modified.
+    """
+    board = bitboard.reduce_puzzle(list(board), tables)
+    if board is False:
+        return False
+    encoding = encode(board, tables)
+    model = satisfiable(encoding.n_vars, encoding.clauses)
+    if model is False:
+        return False
+    return decode(model, encoding, len(board))
+
+
+def main(args):
+    tables = variants.get_tables(args.variant)
+    board = bitboard.grid2board(args.grid, tables)
+    if args.propagate:
+        board = bitboard.reduce_puzzle(board, tables)
+        if board is False:
+            raise SystemExit("The puzzle has no solution")
+    encoding = encode(board, tables)
+    text = dimacs(encoding, ['{} sudoku {}'.format(args.variant, args.grid)])
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print("Wrote {} variables and {} clauses to {}".format(
+            encoding.n_vars, len(encoding.clauses), args.output))
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Export a Sudoku puzzle as a DIMACS CNF formula.",
+        epilog=textwrap.dedent("""\
+            The comment lines map every variable back to its (box, digit)
+            candidate, so a model from an external solver can be decoded.
+
+            Example Usage:
+            --------------
+            - Export a diagonal puzzle:
+
+                $python sat.py 2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3 -o puzzle.cnf
+
+            - Export only the candidates left after constraint propagation:
+
+                $python sat.py <grid> -v classic25 --propagate -o puzzle.cnf
+        """)
+    )
+    parser.add_argument(
+        'grid',
+        help="The puzzle to encode ('.' for empty boxes)."
+    )
+    parser.add_argument(
+        '-v', '--variant', default='diagonal', choices=variants.variant_names(),
+        help="Select the Sudoku variant."
+    )
+    parser.add_argument(
+        '--propagate', action="store_true",
+        help="Encode the board after constraint propagation."
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help="Write the formula to this file instead of standard output."
+    )
+    args = parser.parse_args()
+    main(args)
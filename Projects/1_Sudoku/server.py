@@ -0,0 +1,322 @@
+"""Serve the Sudoku solver to local clients over TCP or a unix socket.
+
+The server keeps a pool of worker processes whose variant tables stay built
+between requests. Each connection sends one JSON request per line::
+
+    {"id": 1, "grid": "2.....", "variant": "diagonal"}
+
+and receives one JSON response per line, in the order the puzzles finish::
+
+    {"id": 1, "solution": "2645...", "solve_ms": 1.2, "total_ms": 3.4}
+
+``solution`` is null when the puzzle has no solution, and an ``error`` field
+replaces it for malformed requests. ``solve_ms`` is the time spent solving and
+``total_ms`` the time from receiving the request to sending the response.
+
+Requests from every connection share one queue. A dispatcher takes whatever
+is queued (waiting at most ``batch_delay`` seconds for more once the first
+request arrives, and taking at most ``batch_size``) and sends it to a worker
+as one batch, with at most one batch in flight per worker. Under light load a
+request is sent on almost at once; under heavy load the batches grow, which
+amortizes the cost of the round trip to the worker.
+
+Each connection has at most ``max_pending`` requests in flight; the server
+stops reading from a client that reaches the limit, and waits for responses
+to be sent before answering more, so a client that sends faster than it
+reads is slowed down rather than buffered without bound.
+"""
+import argparse
+import asyncio
+import json
+import os
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import variants
+
+
+HOST = '127.0.0.1'
+PORT = 8765
+BATCH_SIZE = 32
+BATCH_DELAY = 0.001  # seconds to wait for more requests before sending a batch
+MAX_PENDING = 64  # requests in flight per connection
+
+
+def _solve_one(variant, grid):
+    try:
+        tables = variants.get_tables(variant)
+    except KeyError as e:
+        return {'error': e.args[0]}
+    if len(grid) != len(tables.boxes) or not set(grid) <= set(tables.symbols + '.'):
+        return {'error': "grid must be {} characters of {!r} or '.'".format(len(tables.boxes),
+                                                                         tables.symbols)}
+    board = bitboard.search(bitboard.grid2board(grid, tables), tables)
+    return {'solution': bitboard.board2grid(board, tables) if board else None}
+
+
+def solve_batch(items):
+    """Solve a list of (variant, grid) pairs, returning a result dict for each
+
+    This runs in the worker processes; each result holds either ``solution``
+    or ``error``, and ``solve_ms``.
+    """
+    results = []
+    for variant, grid in items:
+        start = time.perf_counter()
+        result = _solve_one(variant, grid)
+        result['solve_ms'] = (time.perf_counter() - start) * 1000
+        results.append(result)
+    return results
+
+
+class SudokuServer:
+    """A batching solver server
+
+    Parameters
+    ----------
+    workers(int or None)
+        the number of worker processes (defaults to the number of CPUs)
+
+    batch_size(int)
+        the largest number of puzzles sent to a worker at once
+
+    batch_delay(float)
+        the longest time in seconds to wait for a batch to fill up
+
+    max_pending(int)
+        the largest number of requests in flight on one connection
+    """
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY,
+                 max_pending=MAX_PENDING):
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1, got {}".format(workers))
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1, got {}".format(batch_size))
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1, got {}".format(max_pending))
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.pool = None
+        self.server = None
+        self.connections = {}  # the handler task of each open connection, by writer
+        self.tasks = set()  # the running batches, kept referenced until they finish
+
+    async def start(self, host=HOST, port=PORT, path=None):
+        """Start listening on host and port, or on the unix socket at path"""
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.dispatcher = asyncio.ensure_future(self._dispatch())
+        if path is None:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        else:
+            self.server = await asyncio.start_unix_server(self._handle, path)
+        return self.server
+
+    async def close(self):
+        """Stop listening, end the open connections and shut the workers down"""
+        self.server.close()
+        for writer in list(self.connections):
+            writer.close()
+        if self.connections:
+            await asyncio.wait(list(self.connections.values()))
+        await self.server.wait_closed()
+        self.dispatcher.cancel()
+        self.pool.shutdown()
+
+    async def solve(self, grid, variant='diagonal'):
+        """Queue a puzzle and wait for its result dict"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((variant, grid, future))
+        return await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self.slots.acquire()
+            task = asyncio.ensure_future(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, solve_batch,
+                                                 [(variant, grid) for variant, grid, _ in batch])
+        except Exception as e:  # a broken pool fails the whole batch
+            results = [{'error': repr(e)}] * len(batch)
+        finally:
+            self.slots.release()
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _answer(self, line, writer):
+        start = time.perf_counter()
+        request = None
+        try:
+            request = json.loads(line)
+            grid, variant = request['grid'], request.get('variant', 'diagonal')
+            if not isinstance(grid, str) or not isinstance(variant, str):
+                raise TypeError
+        except (ValueError, TypeError, KeyError, AttributeError):
+            response = {'error': "expected a JSON object with a string 'grid' field"}
+            request = request if isinstance(request, dict) else {}
+        else:
+            response = dict(await self.solve(grid, variant))
+        response['id'] = request.get('id')
+        response['total_ms'] = (time.perf_counter() - start) * 1000
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        self.connections[writer] = asyncio.current_task()
+        pending = set()
+        slots = asyncio.Semaphore(self.max_pending)
+
+        async def answer(line):
+            try:
+                await self._answer(line, writer)
+            except ConnectionError:
+                pass  # the client went away
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # reset, or a line over the stream limit
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(answer(line))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                else:
+                    slots.release()
+            if pending:
+                await asyncio.wait(pending)
+            if not writer.is_closing():
+                await writer.drain()
+        except ConnectionError:
+            pass  # the client went away
+        finally:
+            del self.connections[writer]
+            writer.close()
+
+
+async def query(grids, variant='diagonal', host=HOST, port=PORT, path=None):
+    """Send grids to a running server over one connection and return the responses in order"""
+    if path is None:
+        reader, writer = await asyncio.open_connection(host, port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(path)
+
+    async def send():
+        for k, grid in enumerate(grids):
+            writer.write(json.dumps({'id': k, 'grid': grid, 'variant': variant}).encode() + b'\n')
+            await writer.drain()
+
+    # read while sending, so that a server limiting the requests in flight keeps going
+    sending = asyncio.ensure_future(send())
+    try:
+        responses = [None] * len(grids)
+        for _ in grids:
+            response = json.loads(await reader.readline())
+            responses[response['id']] = response
+        await sending
+        return responses
+    finally:
+        sending.cancel()
+        writer.close()
+
+
+async def serve(args):
+    server = SudokuServer(args.processes, args.batch_size, args.batch_delay, args.max_pending)
+    await server.start(args.host, args.port, args.unix)
+    print("Serving on {}".format(args.unix or '{}:{}'.format(args.host, args.port)))
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Serve the Sudoku solver to local clients.",
+        epilog=textwrap.dedent("""\
+            Each request is one line of JSON: {"id": ..., "grid": ..., "variant": ...}
+            (variant defaults to 'diagonal'). Each response is one line of JSON
+            with the same id, the solution (or an error) and the timings.
+
+            Example Usage:
+            --------------
+            - Serve on the default localhost port with 4 worker processes:
+
+                $python server.py -p 4
+
+            - Serve on a unix socket:
+
+                $python server.py --unix /tmp/sudoku.sock
+        """)
+    )
+    parser.add_argument(
+        '--host', default=HOST,
+        help="Listen on this address."
+    )
+    parser.add_argument(
+        '--port', type=int, default=PORT,
+        help="Listen on this TCP port."
+    )
+    parser.add_argument(
+        '--unix', default=None,
+        help="Listen on a unix socket at this path instead of TCP."
+    )
+    parser.add_argument(
+        '-p', '--processes', type=int, default=None,
+        help="Set the number of worker processes (defaults to the number of CPUs)."
+    )
+    parser.add_argument(
+        '-b', '--batch-size', type=int, default=BATCH_SIZE,
+        help="Set the largest number of puzzles sent to a worker at once."
+    )
+    parser.add_argument(
+        '-d', '--batch-delay', type=float, default=BATCH_DELAY,
+        help="Set the longest time in seconds to wait for a batch to fill up."
+    )
+    parser.add_argument(
+        '-m', '--max-pending', type=int, default=MAX_PENDING,
+        help="Set the largest number of requests in flight on one connection."
+    )
+    args = parser.parse_args()
+    if args.processes is not None and args.processes < 1:
+        parser.error("--processes must be at least 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.max_pending < 1:
+        parser.error("--max-pending must be at least 1")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
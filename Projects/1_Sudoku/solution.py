@@ -1,6 +1,13 @@
 
 from utils import *
 import copy
+from collections import defaultdict
+from itertools import combinations
+
+import bitboard
+import dlx
+import sat
+import variants
 
 def get_diagonal():
     
@@ -26,14 +33,7 @@ unitlist = unitlist + diagonal_units
 # Must be called after all units (including diagonals) are added to the unitlist
 units = extract_units(unitlist, boxes)
 peers = extract_peers(units, boxes)
-
-def is_twins(values , tw1 , tw2):
-    """checks whether two boxes in unit is twin.
-    """
-    return (values[tw1] == values[tw2] and len(values[tw2]) == 2)
-    
-def intersect(a, b):
-     return list(set(a) & set(b))
+tables = variants.get_tables('diagonal')
 
 def naked_twins(values):
     """Eliminate values using the naked twins strategy.
@@ -73,13 +73,19 @@ def naked_twins(values):
     https://github.com/udacity/artificial-intelligence/blob/master/Projects/1_Sudoku/pseudocode.md
     """
     val_cop = values.copy()
-    for box1,val in values.items() :
-        for box2 in peers[box1]:   
-            if( is_twins(values,box1,box2) ):
-                for box3 in intersect(peers[box1] , peers[box2]) :
-                    for digit in values[box1] :
-                        val_cop[box3] = val_cop[box3].replace(digit,'')
-    return val_cop 
+    for unit in unitlist:
+        # group the two-candidate boxes of the unit by value, so twins are found in
+        # one pass over the unit instead of by comparing every box with every peer
+        pairs = defaultdict(list)
+        for box in unit:
+            if len(values[box]) == 2:
+                pairs[values[box]].append(box)
+        for val, twins in pairs.items():
+            for box1, box2 in combinations(twins, 2):
+                for box3 in peers[box1] & peers[box2]:
+                    for digit in val:
+                        val_cop[box3] = val_cop[box3].replace(digit, '')
+    return val_cop
 
 
 def eliminate(values):
@@ -149,7 +155,7 @@ def search(values):
 
 
 
-def solve(grid):
+def solve(grid, variant='diagonal', engine='bitmask', cache=None, profile=None):
     """Find the solution to a Sudoku puzzle using search and constraint propagation
 
     Parameters
@@ -159,20 +165,94 @@ def solve(grid):
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
 
+    variant(string)
+        the name of the Sudoku variant the grid belongs to (see ``variants.variant_names()``)
+
+    engine(string)
+        'bitmask' for constraint propagation and depth-first search, 'dlx'
+        to solve the puzzle as an exact-cover problem with dancing links, or
+        'sat' to propagate, encode the remaining candidates as CNF and solve
+        them with a clause-learning SAT solver
+
+    cache(bitboard.PropagationCache or None)
+        a cache shared across calls that skips repeated propagation and
+        subtrees already proven to be dead ends (bitmask engine only)
+
+    profile(bitboard.Profile or None)
+        collects the calls, time and eliminations of each propagation strategy
+        and the branching of the search (bitmask engine only)
+
     Returns
     -------
     dict or False
         The dictionary representation of the final sudoku grid or False if no solution exists.
     """
-    values = grid2values(grid)
-    values = search(values)
-    return values
+    if engine not in ('bitmask', 'dlx', 'sat'):
+        raise ValueError("Unknown engine {!r}; choose 'bitmask', 'dlx' or 'sat'".format(engine))
+    board_tables = variants.get_tables(variant)
+    board = bitboard.grid2board(grid, board_tables)
+    if history.enabled:
+        history.clear()
+    if engine == 'dlx':
+        cover = next(dlx.DancingLinks(board, board_tables).covers(), None)
+        if cover is None:
+            return False
+        if history.enabled:
+            # record the rows in the order they were chosen, skipping the givens
+            history.extend((board_tables.boxes[i], board_tables.symbols[d])
+                           for i, d in cover if board[i] & (board[i] - 1))
+        return {board_tables.boxes[i]: board_tables.symbols[d] for i, d in cover}
+    if engine == 'sat':
+        solved = sat.search(board, board_tables)
+        if solved is False:
+            return False
+        if history.enabled:
+            # the model has no assignment order; record the open boxes in board order
+            history.extend((board_tables.boxes[i], board_tables.symbols[m.bit_length() - 1])
+                           for i, m in enumerate(solved) if board[i] & (board[i] - 1))
+        return bitboard.board2values(solved, board_tables)
+    trail = [] if history.enabled else None
+    board = bitboard.search(board, board_tables, trail, cache=cache, profile=profile)
+    if board is False:
+        return False
+    if trail is not None:
+        history.extend(bitboard.assignments(board, trail, board_tables))
+    return bitboard.board2values(board, board_tables)
+
+
+def count_solutions(grid, limit=2, variant='diagonal'):
+    """Count the solutions of a Sudoku puzzle, stopping once ``limit`` are found
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    limit(int or None)
+        stop searching after this many solutions (None counts them all)
+
+    variant(string)
+        the name of the Sudoku variant the grid belongs to (see ``variants.variant_names()``)
+
+    Returns
+    -------
+    int
+        The number of solutions found, at most ``limit``
+    """
+    board_tables = variants.get_tables(variant)
+    return bitboard.count_solutions(bitboard.grid2board(grid, board_tables), board_tables, limit)
+
+
+def is_unique(grid, variant='diagonal'):
+    """Return True if the Sudoku puzzle has exactly one solution"""
+    return count_solutions(grid, 2, variant) == 1
 
 
 if __name__ == "__main__":
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
   
     display(grid2values(diag_sudoku_grid))
+    history.start()
     result = solve(diag_sudoku_grid)
     display(result)
 
@@ -0,0 +1,144 @@
+"""Canonical forms of diagonal Sudoku grids under the symmetries of the puzzle.
+
+Two grids are isomorphic when one can be turned into the other by relabeling
+the digits and by a geometric transformation that maps rows, columns, squares
+and both diagonals onto units of the same kind. For the diagonal variant the
+geometric transformations are:
+
+- a row permutation ``a`` that keeps the bands (groups of three rows) together
+  and commutes with the reflection ``i -> 8 - i``, so each diagonal box lands
+  on a diagonal (24 choices)
+- the same permutation applied to the columns, or its mirror image, which
+  swaps the two diagonals (2 choices)
+- optionally, transposition (2 choices)
+
+giving 96 transformations. The canonical form of a grid is the smallest string
+among the 96 transformed grids, each relabeled so that digits are numbered in
+order of first appearance. Every transformation is a precomputed index tuple,
+and a transformed grid is abandoned as soon as it compares larger than the
+best one so far, so most transformations cost only a few boxes.
+
+    >>> grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+    >>> canon, transform = canonical(grid)
+    >>> apply_transform(grid, transform) == canon
+    True
+    >>> undo_transform(canon, transform) == grid
+    True
+"""
+from collections import namedtuple
+from itertools import permutations
+
+
+SYMBOLS = '123456789'
+EMPTY = '.'
+
+Transform = namedtuple('Transform', ['perm', 'relabel'])
+Transform.__doc__ = """A symmetry of the board followed by a relabeling of the digits
+
+    perm(tuple)
+        for each box of the transformed grid, the index of its source box
+
+    relabel(dict)
+        a ``str.translate`` table from the source digits to the new ones
+"""
+
+
+def _row_permutations():
+    """The band-preserving row permutations that commute with i -> 8 - i"""
+    result = []
+    for outer in permutations(range(3)):
+        for middle in ((3, 4, 5), (5, 4, 3)):
+            top = outer
+            bottom = tuple(8 - i for i in outer[::-1])
+            result.append(top + middle + bottom)
+            result.append(bottom + middle + top)
+    return result
+
+
+def _transforms():
+    perms = set()
+    for a in _row_permutations():
+        for b in (a, tuple(8 - i for i in a)):
+            perm = tuple(a[r] * 9 + b[c] for r in range(9) for c in range(9))
+            perms.add(perm)
+            perms.add(tuple(perm[c * 9 + r] for r in range(9) for c in range(9)))
+    return sorted(perms)
+
+
+TRANSFORMS = _transforms()
+
+
+def _relabel(grid):
+    """Return the translate table that numbers the digits of grid by first appearance
+
+    Digits missing from the grid follow in their natural order, so the table is
+    a full permutation and also maps the solution of the grid.
+    """
+    order = sorted(set(grid) - {EMPTY}, key=grid.find)
+    order += [d for d in SYMBOLS if d not in order]
+    return str.maketrans(''.join(order), SYMBOLS)
+
+
+def canonical(grid):
+    """Return the canonical form of a grid and the transformation that produces it
+
+    Each transformed grid is relabeled and compared with the best one so far a
+    box at a time, and dropped at the first box where it is larger, so most of
+    the 96 transformations are rejected after a few boxes without being built.
+
+    Parameters
+    ----------
+    grid(string)
+        an 81-character diagonal Sudoku grid, with '.' for empty boxes
+
+    Returns
+    -------
+    tuple
+        (canonical grid string, Transform); isomorphic grids have the same
+        canonical grid
+    """
+    best = best_perm = None
+    for perm in TRANSFORMS:
+        labels = {EMPTY: EMPTY}
+        k = 0
+        if best is not None:
+            # relabel and compare with best until the first box that differs
+            for j in perm:
+                c = labels.get(grid[j])
+                if c is None:
+                    c = labels[grid[j]] = SYMBOLS[len(labels) - 1]
+                if c != best[k]:
+                    break
+                k += 1
+            if k == len(perm) or c > best[k]:
+                continue
+            k += 1
+        # the transformed grid is smaller: finish relabeling it
+        boxes = list(best[:k - 1]) + [c] if k else []
+        for j in perm[k:]:
+            c = labels.get(grid[j])
+            if c is None:
+                c = labels[grid[j]] = SYMBOLS[len(labels) - 1]
+            boxes.append(c)
+        best, best_perm = ''.join(boxes), perm
+    moved = ''.join(map(grid.__getitem__, best_perm))
+    return best, Transform(best_perm, _relabel(moved))
+
+
+def apply_transform(grid, transform):
+    """Apply a transformation to a grid (for example a solution of the original puzzle)"""
+    return ''.join(map(grid.__getitem__, transform.perm)).translate(transform.relabel)
+
+
+def undo_transform(grid, transform):
+    """Map a transformed grid (for example a solution of the canonical puzzle) back"""
+    relabeled = grid.translate({new: old for old, new in transform.relabel.items()})
+    boxes = [EMPTY] * len(relabeled)
+    for k, j in enumerate(transform.perm):
+        boxes[j] = relabeled[k]
+    return ''.join(boxes)
+
+
+def is_isomorphic(grid1, grid2):
+    """Return True if the grids have the same canonical form"""
+    return canonical(grid1)[0] == canonical(grid2)[0]
@@ -0,0 +1,55 @@
+import unittest
+
+import batch
+import vecboard
+from utils import values2grid
+from tests import test_solution
+
+
+GRID = test_solution.TestDiagonalSudoku.diagonal_grid
+SOLVED = values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+
+
+class TestSolveMany(unittest.TestCase):
+    grids = [GRID, '22' + '.' * 79] * 5
+
+    def expected(self):
+        return [(grid, SOLVED if grid == GRID else None) for grid in self.grids]
+
+    def test_in_process(self):
+        self.assertEqual(list(batch.solve_many(self.grids, workers=1, chunksize=3)), self.expected())
+
+    def test_ordered(self):
+        self.assertEqual(list(batch.solve_many(iter(self.grids), workers=2, chunksize=3)), self.expected())
+
+    def test_unordered(self):
+        results = batch.solve_many(iter(self.grids), workers=2, chunksize=1, ordered=False)
+        self.assertEqual(sorted(results, key=repr), sorted(self.expected(), key=repr))
+
+    def test_malformed_grids(self):
+        grids = [GRID, '123', 'x' * 81, GRID]
+        expected = [(GRID, SOLVED), ('123', batch.INVALID), ('x' * 81, batch.INVALID), (GRID, SOLVED)]
+        self.assertEqual(list(batch.solve_many(grids, workers=1)), expected)
+        self.assertEqual(list(batch.solve_many(grids, workers=2, chunksize=4)), expected)
+
+    @unittest.skipIf(vecboard.np is None, "NumPy is not installed")
+    def test_numpy_engine(self):
+        grids = self.grids + ['123']
+        expected = self.expected() + [('123', batch.INVALID)]
+        self.assertEqual(list(batch.solve_many(grids, workers=1, chunksize=4, engine='numpy')), expected)
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            batch.solve_many(self.grids, chunksize=0)
+        with self.assertRaises(ValueError):
+            batch.solve_many(self.grids, workers=0)
+        with self.assertRaises(ValueError):
+            batch.solve_many(self.grids, engine='abacus')
+
+    def test_read_grids(self):
+        lines = ['# comment\n', '\n', '0' * 81 + '\n']
+        self.assertEqual(list(batch.read_grids(lines)), ['.' * 81])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+import unittest
+
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_bundled_corpora(self):
+        for path in benchmark.corpus_paths():
+            variant, grids = benchmark.load_corpus(path)
+            self.assertTrue(grids, path)
+            self.assertTrue(all(len(grid) == 81 for grid in grids), path)
+
+    def test_report(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# variant: classic\n# a comment\n\n')
+            f.write('8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..\n')
+        try:
+            report = benchmark.run_benchmark([f.name])
+        finally:
+            os.remove(f.name)
+        corpus = report['corpora'][os.path.basename(f.name)]
+        self.assertEqual((corpus['variant'], corpus['puzzles']), ('classic', 1))
+        self.assertEqual(set(corpus['solve']), set(benchmark.DEFAULT_ENGINES))
+        self.assertGreater(corpus['solve']['bitmask']['nodes'], 0)
+        self.assertIn('naked_twins', corpus)
+        json.dumps(report)
+        self.assertIn('bitmask', benchmark.format_report(report))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+import json
+import unittest
+
+import bitboard
+import solution
+import variants
+from tests import test_solution as cases
+
+
+class TestBitboard(unittest.TestCase):
+    tables = solution.tables
+
+    def test_round_trip(self):
+        values = cases.TestNakedTwins.before_naked_twins_1
+        board = bitboard.values2board(values, self.tables)
+        self.assertEqual(bitboard.board2values(board, self.tables), values)
+
+    def test_tables_match_peers(self):
+        for i, box in enumerate(self.tables.boxes):
+            names = {self.tables.boxes[p] for p in self.tables.peers[i]}
+            self.assertEqual(names, solution.peers[box])
+
+    def test_naked_twins(self):
+        twins = cases.TestNakedTwins
+        for before, expected in ((twins.before_naked_twins_1, twins.possible_solutions_1),
+                                 (twins.before_naked_twins_2, twins.possible_solutions_2)):
+            board = bitboard.values2board(before, self.tables)
+            result = bitboard.board2values(bitboard.naked_twins(board, self.tables), self.tables)
+            self.assertIn(result, expected)
+
+    def _unit_board(self, masks):
+        """A board whose first row holds the given candidate strings, every other box open"""
+        board = [(1 << self.tables.size) - 1] * len(self.tables.boxes)
+        for i, digits in enumerate(masks):
+            board[i] = sum(1 << (int(d) - 1) for d in digits)
+        return board
+
+    def _apply(self, name, board):
+        strategy = bitboard.STRATEGIES[name]
+        row = self.tables.box_units[0][0]
+        return strategy(board, self.tables, row, None, [], set())
+
+    def test_naked_triples(self):
+        board = self._unit_board(['12', '23', '13', '1234', '12345', '6', '7', '8', '9'])
+        self.assertTrue(self._apply('naked_triples', board))
+        self.assertEqual(board[3], 1 << 3)
+        self.assertEqual(board[4], 1 << 3 | 1 << 4)
+
+    def test_naked_quads(self):
+        board = self._unit_board(['12', '34', '1234', '234', '12345', '123456', '7', '8', '9'])
+        self.assertTrue(self._apply('naked_quads', board))
+        self.assertEqual(board[4], 1 << 4)
+        self.assertEqual(board[5], 1 << 4 | 1 << 5)
+
+    def test_hidden_pairs(self):
+        board = self._unit_board(['1234', '1256', '3456', '3456', '3456', '3456', '7', '8', '9'])
+        self.assertTrue(self._apply('hidden_pairs', board))
+        self.assertEqual(board[0], 0b11)
+        self.assertEqual(board[1], 0b11)
+        self.assertEqual(board[2], 0b111100)
+
+    def test_strategy_selection(self):
+        board = bitboard.grid2board(cases.TestDiagonalSudoku.diagonal_grid, self.tables)
+        result = bitboard.search(board, self.tables, strategies=bitboard.strategies(*bitboard.STRATEGIES))
+        self.assertEqual(bitboard.board2values(result, self.tables),
+                         cases.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_propagate_matches_full_reduction(self):
+        board = bitboard.reduce_puzzle(bitboard.grid2board('2' + '.' * 80, self.tables), self.tables)
+        i = next(i for i, m in enumerate(board) if m & (m - 1))
+        board[i] &= -board[i]
+        expected = bitboard.reduce_puzzle(list(board), self.tables)
+        self.assertEqual(bitboard.propagate(board, self.tables, [i]), expected)
+
+    def test_propagate_conflict(self):
+        tables = self.tables
+        row = [u for u in tables.box_units[0] if 4 in tables.units[u]]
+        # A1 and A5 both hold 1: eliminating A1's digit empties A5, a peer through the row only
+        board = self._unit_board(['1', '23', '23', '23', '1'])
+        conflict = []
+        self.assertFalse(bitboard.propagate(board, tables, (0,), conflict=conflict))
+        self.assertEqual(conflict, row)
+        # no box of the first row can hold 9
+        board = self._unit_board(['12345678'] * 9)
+        conflict = []
+        self.assertFalse(bitboard.propagate(board, tables, (0,), conflict=conflict))
+        self.assertEqual(conflict, row)
+
+    def test_undo_restores_board(self):
+        board = bitboard.reduce_puzzle(bitboard.grid2board('2' + '.' * 80, self.tables), self.tables)
+        before = list(board)
+        trail = [(1, board[1])]
+        board[1] &= -board[1]
+        bitboard.propagate(board, self.tables, [1], trail)
+        self.assertNotEqual(board, before)
+        bitboard.undo(board, trail, 0)
+        self.assertEqual(board, before)
+        self.assertEqual(trail, [])
+
+    def test_search(self):
+        board = bitboard.grid2board(cases.TestDiagonalSudoku.diagonal_grid, self.tables)
+        result = bitboard.search(board, self.tables)
+        self.assertEqual(bitboard.board2values(result, self.tables),
+                         cases.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_count_solutions(self):
+        tables = bitboard.build_tables(*variants.classic(4))
+        self.assertEqual(bitboard.count_solutions(bitboard.grid2board('.' * 16, tables), tables, None), 288)
+        self.assertEqual(bitboard.count_solutions(bitboard.grid2board('.' * 16, tables), tables, 5), 5)
+
+    def test_search_stats(self):
+        stats = bitboard.SearchStats()
+        tables = variants.get_tables('classic')
+        grid = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+        bitboard.search(bitboard.grid2board(grid, tables), tables, stats=stats)
+        self.assertGreater(stats.nodes, 0)
+        self.assertEqual(stats.propagations, stats.nodes + 1)
+        self.assertLessEqual(stats.backtracks, stats.nodes)
+
+    def test_profile(self):
+        board = bitboard.grid2board(cases.TestDiagonalSudoku.diagonal_grid, self.tables)
+        before = sum(bin(m).count('1') for m in board)
+        profile = bitboard.Profile()
+        reduced = bitboard.reduce_puzzle(list(board), self.tables, profile=profile)
+        self.assertEqual(reduced, bitboard.reduce_puzzle(list(board), self.tables))
+        counts = profile.as_dict()['strategies']
+        self.assertEqual(list(counts), ['eliminate', 'only_choice', 'naked_twins', 'hidden_pairs'])
+        self.assertEqual(sum(entry['eliminated'] for entry in counts.values()),
+                         before - sum(bin(m).count('1') for m in reduced))
+        self.assertTrue(all(entry['calls'] > 0 for entry in counts.values()))
+
+        tables = variants.get_tables('classic')
+        grid = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+        stats, profile = bitboard.SearchStats(), bitboard.Profile()
+        trail = []
+        result = bitboard.search(bitboard.grid2board(grid, tables), tables, trail, stats=stats,
+                                 profile=profile)
+        self.assertEqual(result, bitboard.search(bitboard.grid2board(grid, tables), tables))
+        search = json.loads(profile.to_json())['search']
+        self.assertGreaterEqual(search['branches'], stats.nodes)
+        self.assertGreaterEqual(search['branching_factor'], 2)
+
+    def test_heuristics(self):
+        tables = variants.get_tables('classic')
+        grid = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+        expected = bitboard.search(bitboard.grid2board(grid, tables), tables)
+        for select in bitboard.SELECTIONS:
+            for order in bitboard.ORDERINGS:
+                stats = bitboard.SearchStats()
+                result = bitboard.search(bitboard.grid2board(grid, tables), tables, stats=stats,
+                                         heuristics=bitboard.heuristics(select, order))
+                self.assertEqual(result, expected, (select, order))
+                self.assertGreater(stats.nodes, 0)
+        tables4 = bitboard.build_tables(*variants.classic(4))
+        board = bitboard.grid2board('.' * 16, tables4)
+        self.assertEqual(bitboard.count_solutions(board, tables4, None,
+                                                  heuristics=bitboard.heuristics('domwdeg', 'lcv')), 288)
+
+    def test_least_constraining_value(self):
+        board = self._unit_board(['123', '23', '23'])
+        self.assertEqual(bitboard.ORDERINGS['lcv'](board, self.tables, 0)[0], 0b1)
+        self.assertEqual(bitboard.ORDERINGS['ascending'](board, self.tables, 0), [0b1, 0b10, 0b100])
+
+    def test_propagation_cache(self):
+        tables = variants.get_tables('classic')
+        grid = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+        expected = bitboard.search(bitboard.grid2board(grid, tables), tables)
+        cache = bitboard.PropagationCache()
+        for _ in range(2):
+            stats = bitboard.SearchStats()
+            result = bitboard.search(bitboard.grid2board(grid, tables), tables, stats=stats, cache=cache)
+            self.assertEqual(result, expected)
+        self.assertGreater(cache.hits, 0)
+        self.assertTrue(any(value is cache.DEAD for value in cache.entries.values()))
+        self.assertEqual(bitboard.count_solutions(bitboard.grid2board(grid, tables), tables, cache=cache), 1)
+        self.assertFalse(bitboard.search(bitboard.grid2board('22' + '.' * 79, self.tables), self.tables,
+                                         cache=cache))
+
+    def test_propagation_cache_variants(self):
+        # the diagonal puzzle has no solution; its dead ends must not leak into the classic board
+        grid = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+        cache = bitboard.PropagationCache()
+        for variant in ('diagonal', 'classic', 'diagonal'):
+            tables = variants.get_tables(variant)
+            expected = bitboard.search(bitboard.grid2board(grid, tables), tables)
+            result = bitboard.search(bitboard.grid2board(grid, tables), tables, cache=cache)
+            self.assertEqual(result, expected, variant)
+        self.assertEqual(len(cache.layouts), 2)
+
+    def test_propagation_cache_eviction(self):
+        cache = bitboard.PropagationCache(maxsize=2)
+        boards = [bitboard.grid2board(str(d) + '.' * 80, self.tables) for d in (1, 2, 3)]
+        for board in boards:
+            cache.reduce(board, self.tables)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(cache.key(boards[0], self.tables), cache.entries)
+        with self.assertRaises(ValueError):
+            bitboard.PropagationCache(maxsize=0)
+
+    def test_search_unsolvable(self):
+        grid = '22' + '.' * 79
+        self.assertFalse(bitboard.search(bitboard.grid2board(grid, self.tables), self.tables))
+
+
+if __name__ == '__main__':
+    unittest.main()
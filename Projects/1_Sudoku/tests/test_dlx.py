@@ -0,0 +1,40 @@
+import unittest
+
+import bitboard
+import dlx
+import solution
+import variants
+from tests import test_solution
+
+
+HARD_CLASSIC = '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..'
+
+
+class TestDancingLinks(unittest.TestCase):
+
+    def test_solve_diagonal(self):
+        cases = test_solution.TestDiagonalSudoku
+        self.assertEqual(solution.solve(cases.diagonal_grid, engine='dlx'), cases.solved_diag_sudoku)
+
+    def test_matches_bitmask_engine(self):
+        tables = variants.get_tables('classic')
+        expected = bitboard.search(bitboard.grid2board(HARD_CLASSIC, tables), tables)
+        self.assertEqual(dlx.search(bitboard.grid2board(HARD_CLASSIC, tables), tables), expected)
+
+    def test_enumerates_all_solutions(self):
+        tables = bitboard.build_tables(*variants.classic(4))
+        boards = list(dlx.solutions(bitboard.grid2board('.' * 16, tables), tables))
+        self.assertEqual(len(boards), 288)
+        self.assertEqual(len({tuple(b) for b in boards}), 288)
+        self.assertTrue(all(bitboard.is_solved(b) for b in boards))
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.solve('22' + '.' * 79, engine='dlx'))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            solution.solve(test_solution.TestDiagonalSudoku.diagonal_grid, engine='magic')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+import solution
+from utils import History, grid2values
+from tests import test_solution as cases
+
+
+def read_chunks(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    pos, chunks = 8, []
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        kind, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        chunks.append((kind, body, crc == zlib.crc32(kind + body)))
+        pos += 12 + length
+    return data[:8], chunks
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestExport(unittest.TestCase):
+    grid = cases.TestDiagonalSudoku.diagonal_grid
+
+    def setUp(self):
+        import export
+        self.export = export
+        self.values = grid2values(self.grid)
+        self.history = History()
+        solution.history, saved = self.history, solution.history
+        try:
+            self.history.start()
+            self.result = solution.solve(self.grid)
+        finally:
+            solution.history = saved
+
+    def test_apng(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'solve.png')
+            n_frames = self.export.export_apng(path, self.values, self.result, self.history)
+            signature, chunks = read_chunks(path)
+        self.assertEqual(n_frames, len(self.history) + 1)
+        self.assertEqual(signature, self.export.PNG_SIGNATURE)
+        self.assertTrue(all(ok for _, _, ok in chunks))
+        kinds = [kind for kind, _, _ in chunks]
+        self.assertEqual(kinds[:4], [b'IHDR', b'acTL', b'fcTL', b'IDAT'])
+        self.assertEqual(kinds[-1], b'IEND')
+        self.assertEqual(kinds.count(b'fcTL'), n_frames)
+        self.assertEqual(kinds.count(b'fdAT'), n_frames - 1)
+        self.assertEqual(struct.unpack('>II', chunks[1][1]), (n_frames, 0))
+        # every frame after the first covers a single square
+        widths = [struct.unpack('>I', body[4:8])[0] for kind, body, _ in chunks if kind == b'fcTL']
+        self.assertEqual(widths[0], 700)
+        self.assertTrue(all(w < 60 for w in widths[1:]))
+
+    def test_frames(self):
+        steps = History()
+        steps.extend(list(self.history)[:3])
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(self.export.export_frames(tmp, self.values, self.result, steps), 4)
+            self.assertEqual(sorted(os.listdir(tmp))[-1], 'frame00003.png')
+            signature, chunks = read_chunks(os.path.join(tmp, 'frame00000.png'))
+        self.assertEqual(signature, self.export.PNG_SIGNATURE)
+        self.assertEqual([kind for kind, _, ok in chunks if ok], [b'IHDR', b'IDAT', b'IEND'])
+
+    def test_writer_checks_frame_count(self):
+        surface = pygame.Surface((4, 4))
+        with tempfile.TemporaryFile() as f:
+            writer = self.export.APNGWriter(f, (4, 4), 2)
+            with self.assertRaises(ValueError):
+                writer.add_frame(surface, (0, 0, 2, 2))
+            writer.add_frame(surface)
+            with self.assertRaises(ValueError):
+                writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
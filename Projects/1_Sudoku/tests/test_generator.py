@@ -0,0 +1,49 @@
+import random
+import unittest
+
+import bitboard
+import generator
+import solution
+import variants
+from tests import test_dlx
+
+
+class TestGenerator(unittest.TestCase):
+    def test_unique_and_consistent(self):
+        rng = random.Random(5)
+        for variant in ('diagonal', 'classic'):
+            puzzle = generator.generate(variant, rng)
+            self.assertEqual(solution.count_solutions(puzzle.grid, variant=variant), 1)
+            self.assertEqual(puzzle.clues, sum(c != '.' for c in puzzle.grid))
+            self.assertTrue(all(c in ('.', s) for c, s in zip(puzzle.grid, puzzle.solution)))
+            tables = variants.get_tables(variant)
+            self.assertTrue(bitboard.is_solved(bitboard.grid2board(puzzle.solution, tables)))
+
+    def test_minimal(self):
+        puzzle = generator.generate('classic', seed=2)
+        for i, c in enumerate(puzzle.grid):
+            if c != '.':
+                grid = puzzle.grid[:i] + '.' + puzzle.grid[i + 1:]
+                self.assertEqual(solution.count_solutions(grid, variant='classic'), 2)
+
+    def test_min_clues(self):
+        puzzle = generator.generate('classic', seed=2, min_clues=40)
+        self.assertEqual(puzzle.clues, 40)
+
+    def test_grade(self):
+        grade = generator.grade(test_dlx.HARD_CLASSIC, 'classic')
+        self.assertEqual(grade.level, generator.BRANCHING)
+        self.assertGreater(grade.nodes, 0)
+        solved = generator.generate('classic', seed=2).solution
+        self.assertEqual(generator.grade('.' + solved[1:], 'classic'), ('easy', ('only_choice',), 0))
+
+    def test_generate_many(self):
+        puzzles = list(generator.generate_many(3, 'classic', seed=4, levels=['easy', 'medium']))
+        self.assertEqual(len(puzzles), 3)
+        self.assertTrue(all(p.grade.level in ('easy', 'medium') for p in puzzles))
+        with self.assertRaises(ValueError):
+            next(generator.generate_many(1, levels=['trivial']))
+
+
+if __name__ == '__main__':
+    unittest.main()
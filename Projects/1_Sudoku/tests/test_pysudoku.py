@@ -0,0 +1,43 @@
+import os
+import unittest
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+import solution
+from utils import grid2values, reconstruct
+from tests import test_solution as cases
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestBoard(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.init()
+        self.background = pygame.image.load(os.path.join('images', 'sudoku-board-bare.jpg'))
+
+    def test_dirty_redraw_matches_full_redraw(self):
+        import PySudoku
+        grid = cases.TestDiagonalSudoku.diagonal_grid
+        history = solution.history
+        history.start()
+        try:
+            result = solution.solve(grid)
+            steps = reconstruct(result, history)
+        finally:
+            history.stop()
+        surface = pygame.Surface((700, 700))
+        board = PySudoku.Board(surface, self.background, grid2values(grid))
+        board.draw()
+        for box, value in steps:
+            area = board.assign(box, value)
+            self.assertTrue(surface.get_rect().contains(area))
+        expected = pygame.Surface((700, 700))
+        PySudoku.Board(expected, self.background, result).draw()
+        self.assertEqual(pygame.image.tobytes(surface, 'RGB'), pygame.image.tobytes(expected, 'RGB'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import random
+import unittest
+
+import bitboard
+import generator
+import sat
+import solution
+import variants
+from tests import test_dlx, test_solution
+
+
+class TestSat(unittest.TestCase):
+
+    def test_solve_diagonal(self):
+        cases = test_solution.TestDiagonalSudoku
+        self.assertEqual(solution.solve(cases.diagonal_grid, engine='sat'), cases.solved_diag_sudoku)
+
+    def test_matches_bitmask_engine(self):
+        tables = variants.get_tables('classic')
+        board = bitboard.grid2board(test_dlx.HARD_CLASSIC, tables)
+        self.assertEqual(sat.search(board, tables), bitboard.search(list(board), tables))
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.solve('22' + '.' * 79, engine='sat'))
+        tables = bitboard.build_tables(*variants.classic(4))
+        # the clues propagate no contradiction, but 1 has no place in the top-left square
+        board = bitboard.grid2board('..1.' '....' '1...' '....', tables)
+        board[0] = board[1] = board[4] = board[5] = 0b1110
+        self.assertFalse(sat.search(board, tables))
+
+    def test_counts_all_models(self):
+        tables = bitboard.build_tables(*variants.classic(4))
+        # fixing the first row leaves 288 / 4! of the 4x4 grids
+        encoding = sat.encode(bitboard.grid2board('1234' + '.' * 12, tables), tables)
+        clauses = list(encoding.clauses)
+        boards = set()
+        while True:
+            model = sat.satisfiable(encoding.n_vars, clauses)
+            if model is False:
+                break
+            board = sat.decode(model, encoding, 16)
+            self.assertTrue(bitboard.is_solved(board))
+            boards.add(tuple(board))
+            clauses.append([-v for v in range(1, encoding.n_vars + 1) if model[v]])
+        self.assertEqual(len(boards), 12)
+
+    def test_large_variant(self):
+        tables = variants.get_tables('classic25')
+        rng = random.Random(0)
+        solved = None
+        while solved is None:
+            solved = generator._random_solution(tables, rng)
+        full = (1 << tables.size) - 1
+        board = [m if rng.random() < 0.5 else full for m in solved]
+        result = sat.search(board, tables)
+        self.assertTrue(bitboard.is_solved(result))
+        self.assertTrue(all(m & b for m, b in zip(result, board)))
+        self.assertIsNot(bitboard.propagate(list(result), tables, range(len(result))), False)
+
+    def test_dimacs(self):
+        tables = variants.get_tables('diagonal')
+        board = bitboard.grid2board(test_solution.TestDiagonalSudoku.diagonal_grid, tables)
+        encoding = sat.encode(board, tables)
+        text = sat.dimacs(encoding, ['diagonal'])
+        lines = text.splitlines()
+        self.assertEqual(lines[0], 'c diagonal')
+        header = [line for line in lines if line.startswith('p ')]
+        self.assertEqual(header, ['p cnf {} {}'.format(encoding.n_vars, len(encoding.clauses))])
+        body = lines[lines.index(header[0]) + 1:]
+        self.assertEqual(len(body), len(encoding.clauses))
+        self.assertEqual([int(lit) for lit in body[0].split()], encoding.clauses[0] + [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
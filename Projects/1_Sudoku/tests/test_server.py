@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import server
+from utils import values2grid
+from tests import test_solution
+
+
+GRID = test_solution.TestDiagonalSudoku.diagonal_grid
+SOLVED = values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+
+
+class TestServer(unittest.TestCase):
+    def run_server(self, client, path=None, **kwargs):
+        async def main():
+            app = server.SudokuServer(workers=1, batch_size=4, **kwargs)
+            await app.start(port=0, path=path)
+            try:
+                port = None if path else app.server.sockets[0].getsockname()[1]
+                return await client(port)
+            finally:
+                await app.close()
+        return asyncio.run(main())
+
+    def test_pending_limit(self):
+        grids = [GRID, 'x'] * 100
+
+        async def client(port):
+            return await server.query(grids, port=port)
+
+        responses = self.run_server(client, max_pending=2)
+        self.assertEqual([r['id'] for r in responses], list(range(len(grids))))
+        self.assertTrue(all(r['solution'] == SOLVED for r in responses[::2]))
+
+    def test_concurrent_clients(self):
+        grids = [GRID, '22' + '.' * 79, 'x']
+
+        async def client(port):
+            return await asyncio.gather(*[server.query(grids, port=port) for _ in range(3)])
+
+        for responses in self.run_server(client):
+            self.assertEqual([r['id'] for r in responses], [0, 1, 2])
+            self.assertEqual(responses[0]['solution'], SOLVED)
+            self.assertIsNone(responses[1]['solution'])
+            self.assertIn('error', responses[2])
+            self.assertTrue(all(r['total_ms'] >= r['solve_ms'] for r in responses))
+
+    def test_variants_and_bad_requests(self):
+        async def client(port):
+            reader, writer = await asyncio.open_connection(server.HOST, port)
+            writer.write(b'not json\n{"id": 7, "grid": 5}\n')
+            writer.write(json.dumps({'id': 8, 'grid': '.' * 16, 'variant': 'nope'}).encode() + b'\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(3)]
+            writer.close()
+            classic = await server.query(['.' * 81], variant='classic', port=port)
+            return responses, classic
+
+        responses, classic = self.run_server(client)
+        self.assertTrue(all('error' in r for r in responses))
+        self.assertEqual(sorted(r['id'] for r in responses if r['id'] is not None), [7, 8])
+        self.assertEqual(len(classic[0]['solution']), 81)
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), "unix sockets are not available")
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sudoku.sock')
+            responses = self.run_server(lambda port: server.query([GRID], path=path), path)
+        self.assertEqual(responses[0]['solution'], SOLVED)
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            server.SudokuServer(workers=0)
+        with self.assertRaises(ValueError):
+            server.SudokuServer(batch_size=0)
+        with self.assertRaises(ValueError):
+            server.SudokuServer(max_pending=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
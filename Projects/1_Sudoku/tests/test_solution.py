@@ -4,6 +4,8 @@ many additional test cases that you must also pass to complete the project. You
 own additional test cases to cover any failed tests shown in the Project Assistant feedback.
 """
 import unittest
+from itertools import islice
+
 import solution
 
 
@@ -99,5 +101,30 @@ class TestDiagonalSudoku(unittest.TestCase):
     def test_solve(self):
         self.assertEqual(solution.solve(self.diagonal_grid), self.solved_diag_sudoku)
 
+class TestSolutionCounting(unittest.TestCase):
+    diagonal_grid = TestDiagonalSudoku.diagonal_grid
+
+    def test_unique(self):
+        self.assertTrue(solution.is_unique(self.diagonal_grid))
+        self.assertEqual(solution.count_solutions(self.diagonal_grid, limit=None), 1)
+
+    def test_stops_at_limit(self):
+        self.assertEqual(solution.count_solutions('.' * 81, limit=3), 3)
+        self.assertFalse(solution.is_unique('.' * 81))
+
+    def test_unsolvable(self):
+        self.assertEqual(solution.count_solutions('22' + '.' * 79), 0)
+        self.assertFalse(solution.is_unique('22' + '.' * 79))
+
+    def test_counts_match_dlx_up_to_cap(self):
+        grid = self.diagonal_grid[:45] + '.' * 36
+        board = solution.bitboard.grid2board(grid, solution.tables)
+        covers = islice(solution.dlx.solutions(board, solution.tables), 50)
+        self.assertEqual(solution.count_solutions(grid, limit=50), sum(1 for _ in covers))
+
+    def test_zero_limit(self):
+        self.assertEqual(solution.count_solutions('.' * 81, limit=0), 0)
+
+
 if __name__ == '__main__':
     unittest.main()
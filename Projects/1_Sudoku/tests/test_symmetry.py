@@ -0,0 +1,60 @@
+import random
+import unittest
+
+import bitboard
+import solution
+import symmetry
+from utils import values2grid
+from tests import test_solution as cases
+
+
+class TestSymmetry(unittest.TestCase):
+    grid = cases.TestDiagonalSudoku.diagonal_grid
+
+    def random_isomorph(self, grid, rng):
+        perm = rng.choice(symmetry.TRANSFORMS)
+        digits = list(symmetry.SYMBOLS)
+        rng.shuffle(digits)
+        moved = ''.join(grid[j] for j in perm)
+        return moved.translate(str.maketrans(symmetry.SYMBOLS, ''.join(digits)))
+
+    def test_transforms_preserve_diagonal_sudoku(self):
+        self.assertEqual(len(set(symmetry.TRANSFORMS)), 96)
+        solved = values2grid(cases.TestDiagonalSudoku.solved_diag_sudoku)
+        for perm in symmetry.TRANSFORMS:
+            board = bitboard.grid2board(''.join(solved[j] for j in perm), solution.tables)
+            self.assertTrue(bitboard.is_solved(bitboard.reduce_puzzle(board, solution.tables)))
+
+    def test_isomorphs_share_canonical_form(self):
+        rng = random.Random(0)
+        canon, _ = symmetry.canonical(self.grid)
+        for _ in range(20):
+            other = self.random_isomorph(self.grid, rng)
+            self.assertEqual(symmetry.canonical(other)[0], canon)
+            self.assertTrue(symmetry.is_isomorphic(self.grid, other))
+        self.assertFalse(symmetry.is_isomorphic(self.grid, '.' * 81))
+
+    def test_smallest_transformed_grid(self):
+        solved = values2grid(cases.TestDiagonalSudoku.solved_diag_sudoku)
+        for grid in (self.grid, solved, '.' * 81, self.grid.replace('2', '.')):
+            moved = [''.join(grid[j] for j in perm) for perm in symmetry.TRANSFORMS]
+            expected = min(m.translate(symmetry._relabel(m)) for m in moved)
+            self.assertEqual(symmetry.canonical(grid)[0], expected)
+
+    def test_solution_maps_back(self):
+        other = self.random_isomorph(self.grid, random.Random(3))
+        canon, transform = symmetry.canonical(other)
+        self.assertEqual(symmetry.apply_transform(other, transform), canon)
+        self.assertEqual(symmetry.undo_transform(canon, transform), other)
+        solved = values2grid(solution.solve(canon))
+        self.assertEqual(symmetry.undo_transform(solved, transform), values2grid(solution.solve(other)))
+
+    def test_missing_digits_map_back(self):
+        grid = self.grid.replace('9', '.')
+        canon, transform = symmetry.canonical(grid)
+        solved = values2grid(solution.solve(grid))
+        self.assertEqual(symmetry.undo_transform(symmetry.apply_transform(solved, transform), transform), solved)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import solution
+import utils
+
+
+class TestHistory(unittest.TestCase):
+    grid = '2' + '.' * 80
+
+    def setUp(self):
+        utils.history.stop()
+        utils.history.clear()
+        self.addCleanup(utils.history.stop)
+
+    def test_disabled_by_default(self):
+        solution.solve(self.grid)
+        values = utils.grid2values(self.grid)
+        utils.assign_value(values, 'A2', '3')
+        self.assertEqual(len(utils.history), 0)
+
+    def test_assign_value_records(self):
+        utils.history.start()
+        values = utils.grid2values(self.grid)
+        utils.assign_value(values, 'A2', '3')
+        utils.assign_value(values, 'A3', '45')
+        self.assertEqual(utils.reconstruct(values, utils.history), [('A2', '3')])
+
+    def test_replay_solution(self):
+        utils.history.start()
+        result = solution.solve(self.grid)
+        values = utils.grid2values(self.grid)
+        for box, value in utils.reconstruct(result, utils.history):
+            values[box] = value
+        self.assertEqual(values, result)
+
+    def test_replay_dlx_solution(self):
+        utils.history.start()
+        solution.solve('1' + '.' * 80)
+        result = solution.solve(self.grid, engine='dlx')
+        values = utils.grid2values(self.grid)
+        for box, value in utils.reconstruct(result, utils.history):
+            values[box] = value
+        self.assertEqual(values, result)
+
+    def test_cleared_on_failed_solve(self):
+        utils.history.start()
+        solution.solve(self.grid)
+        self.assertFalse(solution.solve('22' + '.' * 79, engine='dlx'))
+        self.assertEqual(len(utils.history), 0)
+
+    def test_default_maxlen(self):
+        self.assertEqual(utils.History().steps.maxlen, utils.History.MAXLEN)
+
+    def test_ring_buffer_is_bounded(self):
+        utils.history.start(maxlen=10)
+        solution.solve(self.grid)
+        self.assertEqual(len(utils.history), 10)
+
+    def test_legacy_dict_history(self):
+        values = {box: '1' for box in utils.boxes}
+        prev = utils.values2grid(utils.grid2values('.' * 81))
+        legacy = {utils.values2grid(values): (prev, ('A1', '1'))}
+        self.assertEqual(utils.reconstruct(values, legacy), [('A1', '1')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import bitboard
+import variants
+
+
+class TestVariants(unittest.TestCase):
+
+    def test_units_are_full(self):
+        for name in variants.variant_names():
+            tables = variants.get_tables(name)
+            self.assertEqual(len(tables.boxes), tables.size ** 2, name)
+            for unit in tables.units:
+                self.assertEqual(len(set(unit)), tables.size, name)
+
+    def test_peer_counts(self):
+        self.assertEqual({len(p) for p in variants.get_tables('classic').peers}, {20})
+        self.assertEqual({len(p) for p in variants.get_tables('classic16').peers}, {39})
+        self.assertEqual(len(variants.get_tables('diagonal').peers[40]), 32)
+
+    def test_empty_boards_solve(self):
+        for name in ('classic', 'diagonal', 'hyper', 'windoku', 'jigsaw', 'classic16'):
+            tables = variants.get_tables(name)
+            board = bitboard.search(bitboard.grid2board('.' * len(tables.boxes), tables), tables)
+            self.assertTrue(board and bitboard.is_solved(board), name)
+
+    def test_unknown_variant(self):
+        with self.assertRaises(KeyError):
+            variants.get_tables('no-such-variant')
+
+    def test_disk_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.addCleanup(setattr, variants, 'CACHE_DIR', variants.CACHE_DIR)
+        variants.CACHE_DIR = cache_dir
+        variants.register('test-hyper', variants.hyper)
+        self.addCleanup(variants._registry.pop, 'test-hyper')
+        self.addCleanup(variants._tables.pop, 'test-hyper', None)
+        built = variants.get_tables('test-hyper')
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        variants._tables.pop('test-hyper')
+        self.assertEqual(variants.get_tables('test-hyper'), built)
+
+    def test_bad_cache_entry_is_a_miss(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.addCleanup(setattr, variants, 'CACHE_DIR', variants.CACHE_DIR)
+        variants.CACHE_DIR = cache_dir
+        variants.register('test-classic', variants.classic)
+        self.addCleanup(variants._registry.pop, 'test-classic')
+        self.addCleanup(variants._tables.pop, 'test-classic', None)
+        path = variants._cache_path('test-classic', variants.classic())
+        with open(path, 'wb') as f:
+            pickle.dump(('not', 'tables'), f)
+        self.assertEqual(variants.get_tables('test-classic'), variants.get_tables('classic'))
+
+    def test_changed_definition_changes_key(self):
+        units, boxes, symbols = variants.jigsaw()
+        other = variants.jigsaw(variants.JIGSAW_LAYOUT[::-1])
+        self.assertNotEqual(variants._cache_key((units, boxes, symbols)), variants._cache_key(other))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import bitboard
+import variants
+import vecboard
+from tests import test_dlx
+from tests import test_solution as cases
+
+
+@unittest.skipIf(vecboard.np is None, "NumPy is not installed")
+class TestVecboard(unittest.TestCase):
+    tables = variants.get_tables('diagonal')
+
+    def test_round_trip(self):
+        grid = cases.TestDiagonalSudoku.diagonal_grid
+        cand = vecboard.grids2tensor([grid], self.tables)
+        self.assertEqual(cand.shape, (1, 81, 9))
+        self.assertEqual(cand[0, 0].nonzero()[0].tolist(), [1])
+        self.assertTrue(cand[0, 1].all())
+
+    def test_propagate_matches_bitboard(self):
+        grid = '2' + '.' * 80
+        cand, status = vecboard.propagate(vecboard.grids2tensor([grid], self.tables),
+                                          vecboard.incidence(self.tables))
+        expected = bitboard.reduce_puzzle(bitboard.grid2board(grid, self.tables), self.tables,
+                                          bitboard.strategies('only_choice'))
+        masks = [sum(1 << int(d) for d in row.nonzero()[0]) for row in cand[0]]
+        self.assertEqual(masks, expected)
+        self.assertEqual(status.tolist(), [vecboard.STALLED])
+
+    def test_solve_grids(self):
+        grid = cases.TestDiagonalSudoku.diagonal_grid
+        solved = ''.join(cases.TestDiagonalSudoku.solved_diag_sudoku[box] for box in self.tables.boxes)
+        grids = [grid, '22' + '.' * 79, grid]
+        self.assertEqual(vecboard.solve_grids(grids, self.tables, batchsize=2), [solved, None, solved])
+
+    def test_branching(self):
+        tables = variants.get_tables('classic')
+        board = bitboard.search(bitboard.grid2board(test_dlx.HARD_CLASSIC, tables), tables)
+        expected = ''.join(tables.symbols[m.bit_length() - 1] for m in board)
+        self.assertEqual(vecboard.solve_grids([test_dlx.HARD_CLASSIC] * 3, tables), [expected] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
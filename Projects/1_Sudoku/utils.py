@@ -1,11 +1,49 @@
 
-from collections import defaultdict
+from collections import defaultdict, deque
+
+
+class History:
+    """A bounded record of the (box, value) assignments made during one solve
+
+    Recording is off by default; call ``start()`` to begin recording into a
+    fresh ring buffer that keeps at most ``maxlen`` of the most recent steps.
+    """
+    MAXLEN = 4096
+
+    def __init__(self, maxlen=MAXLEN):
+        self.enabled = False
+        self.steps = deque(maxlen=maxlen)
+
+    def start(self, maxlen=MAXLEN):
+        """Enable recording into an empty buffer holding at most maxlen steps"""
+        self.steps = deque(maxlen=maxlen)
+        self.enabled = True
+
+    def stop(self):
+        """Disable recording, keeping the steps recorded so far"""
+        self.enabled = False
+
+    def clear(self):
+        """Discard the recorded steps (e.g., at the start of a new solve)"""
+        self.steps.clear()
+
+    def record(self, box, value):
+        self.steps.append((box, value))
+
+    def extend(self, steps):
+        self.steps.extend(steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
 
 
 rows = 'ABCDEFGHI'
 cols = '123456789'
 boxes = [r + c for r in rows for c in cols]
-history = {}  # history must be declared here so that it exists in the assign_values scope
+history = History()  # history must be declared here so that it exists in the assign_values scope
 
 
 def extract_units(unitlist, boxes):
@@ -27,9 +65,11 @@ def extract_units(unitlist, boxes):
     """
     # the value for keys that aren't in the dictionary are initialized as an empty list
     units = defaultdict(list)
-    for current_box in boxes:
-        for unit in unitlist:
-            if current_box in unit:
+    members = set(boxes)
+    # a single pass over the units instead of a membership scan of every unit for every box
+    for unit in unitlist:
+        for current_box in unit:
+            if current_box in members:
                 # defaultdict avoids this raising a KeyError when new keys are added
                 units[current_box].append(unit)
     return units
@@ -68,8 +108,8 @@ def extract_peers(units, boxes):
 
 def assign_value(values, box, value):
     """You must use this function to update your values dictionary if you want to
-    try using the provided visualization tool. This function records each assignment
-    (in order) for later reconstruction.
+    try using the provided visualization tool. While ``history`` is recording, this
+    function records each assignment (in order) for later reconstruction.
 
     Parameters
     ----------
@@ -85,10 +125,9 @@ def assign_value(values, box, value):
     if values[box] == value:
         return values
 
-    prev = values2grid(values)
     values[box] = value
-    if len(value) == 1:
-        history[values2grid(values)] = (prev, (box, value))
+    if history.enabled and len(value) == 1:
+        history.record(box, value)
     return values
 
 def cross(A, B):
@@ -168,17 +207,21 @@ def reconstruct(values, history):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
-    history(dict)
-        a dictionary of the form {key: (key, (box, value))} encoding a linked
-        list where each element points to the parent and identifies the value
-        assignment that connects from the parent to the current state
+    history(History or dict)
+        the History recorded while solving, or a legacy dictionary of the form
+        {key: (key, (box, value))} encoding a linked list where each element points
+        to the parent and identifies the value assignment that connects from the
+        parent to the current state
 
     Returns
     -------
     list
         a list of (box, value) assignments that can be applied in order to the
-        starting Sudoku puzzle to reach the solution
+        starting Sudoku puzzle to reach the solution (only the most recent steps
+        are kept if the History buffer overflowed)
     """
+    if isinstance(history, History):
+        return list(history)
     path = []
     prev = values2grid(values)
     while prev in history:
@@ -0,0 +1,209 @@
+"""Registry of Sudoku variants and their index tables.
+
+Each variant is described by a builder that returns its list of units, its box
+names and its digit symbols. The index tables for a variant (see
+``bitboard.Tables``) are built the first time the variant is requested and then
+memoized in-process.
+
+Building tables takes milliseconds even for 25x25 boards, so the on-disk pickle
+cache is opt-in: set the ``SUDOKU_TABLE_CACHE`` environment variable to a
+directory to enable it. Cache entries are keyed on a hash of the builder output
+and of the ``build_tables`` source, so they go stale automatically when a
+variant definition or the table layout changes.
+
+    >>> tables = get_tables('diagonal')
+    >>> tables.peers[0][:3]
+    (1, 2, 3)
+"""
+import hashlib
+import inspect
+import os
+import pickle
+
+import bitboard
+
+
+CACHE_DIR = os.environ.get('SUDOKU_TABLE_CACHE')  # None disables the on-disk cache
+
+ROW_LABELS = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+SYMBOLS = {
+    4: '1234',
+    9: '123456789',
+    16: '123456789ABCDEFG',
+    25: 'ABCDEFGHIJKLMNOPQRSTUVWXY',
+}
+
+# each character names the region of the box at the same position (row-major order)
+JIGSAW_LAYOUT = ('AABBBBCCC'
+                 'AABBBBCCC'
+                 'AAAAABCCC'
+                 'DDEEEEEFF'
+                 'DDEDEFFFF'
+                 'GDDDEEFFF'
+                 'GGDGHHIII'
+                 'GGGGHHIII'
+                 'GHHHHHIII')
+
+_registry = {}
+_tables = {}
+
+
+def _labels(n):
+    return ROW_LABELS[:n], [str(c) for c in range(1, n + 1)]
+
+
+def _boxes(n):
+    rows, cols = _labels(n)
+    return [r + c for r in rows for c in cols]
+
+
+def _grid_units(n):
+    """The row, column and square units of an n x n board"""
+    rows, cols = _labels(n)
+    side = int(round(n ** 0.5))
+    row_units = [[r + c for c in cols] for r in rows]
+    column_units = [[r + c for r in rows] for c in cols]
+    square_units = [[rows[r] + cols[c]
+                     for r in range(br, br + side) for c in range(bc, bc + side)]
+                    for br in range(0, n, side) for bc in range(0, n, side)]
+    return row_units + column_units + square_units
+
+
+def _diagonal_units(n):
+    rows, cols = _labels(n)
+    return [[rows[i] + cols[i] for i in range(n)],
+            [rows[i] + cols[n - 1 - i] for i in range(n)]]
+
+
+def _window_units(origins):
+    rows, cols = _labels(9)
+    return [[rows[r + i] + cols[c + j] for i in range(3) for j in range(3)] for r, c in origins]
+
+
+def _region_units(layout):
+    rows, cols = _labels(9)
+    regions = {}
+    for (r, c), region in zip(((r, c) for r in range(9) for c in range(9)), layout):
+        regions.setdefault(region, []).append(rows[r] + cols[c])
+    return [regions[region] for region in sorted(regions)]
+
+
+HYPER_WINDOWS = [(1, 1), (1, 5), (5, 1), (5, 5)]
+
+
+def classic(n=9):
+    """Rows, columns and squares"""
+    return _grid_units(n), _boxes(n), SYMBOLS[n]
+
+
+def diagonal(n=9):
+    """Classic units plus the two main diagonals"""
+    return _grid_units(n) + _diagonal_units(n), _boxes(n), SYMBOLS[n]
+
+
+def hyper():
+    """Classic units plus four extra 3x3 windows"""
+    return _grid_units(9) + _window_units(HYPER_WINDOWS), _boxes(9), SYMBOLS[9]
+
+
+def windoku():
+    """Hyper windows plus the five implied windows that wrap around the board"""
+    units = _grid_units(9) + _window_units(HYPER_WINDOWS)
+    rows, cols = _labels(9)
+    stripes = [(0, 4, 8), (1, 2, 3), (5, 6, 7)]
+    for rs in stripes:
+        for cs in stripes:
+            if rs[0] and cs[0]:
+                continue  # one of the hyper windows
+            units.append([rows[r] + cols[c] for r in rs for c in cs])
+    return units, _boxes(9), SYMBOLS[9]
+
+
+def jigsaw(layout=JIGSAW_LAYOUT):
+    """Rows, columns and irregular regions given by a layout string"""
+    units = _grid_units(9)[:18] + _region_units(layout)
+    return units, _boxes(9), SYMBOLS[9]
+
+
+def register(name, builder, *args):
+    """Register a variant whose units are returned by ``builder(*args)``"""
+    _registry[name] = (builder, args)
+    _tables.pop(name, None)
+
+
+def variant_names():
+    """Return the names of all registered variants"""
+    return sorted(_registry)
+
+
+def _cache_key(definition):
+    """Hash the builder output together with the code that turns it into tables"""
+    key = repr((inspect.getsource(bitboard.build_tables), bitboard.Tables._fields, definition))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _cache_path(name, definition):
+    return os.path.join(CACHE_DIR, '{}-{}.pickle'.format(name, _cache_key(definition)))
+
+
+def _load(path):
+    """Return the tables pickled at path, or None on any kind of cache miss"""
+    try:
+        with open(path, 'rb') as f:
+            tables = pickle.load(f)
+    except Exception:
+        return None
+    return tables if isinstance(tables, bitboard.Tables) else None
+
+
+def _store(path, tables):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = '{}.{}'.format(path, os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump(tables, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # the cache is only an optimization
+
+
+def get_tables(name):
+    """Return the index tables for a registered variant
+
+    Parameters
+    ----------
+    name(str)
+        the name of a registered variant (see ``variant_names()``)
+
+    Returns
+    -------
+    bitboard.Tables
+        the unit and peer tables for the variant
+    """
+    if name in _tables:
+        return _tables[name]
+    if name not in _registry:
+        raise KeyError("Unknown Sudoku variant {!r}; choose from {}".format(name, variant_names()))
+    builder, args = _registry[name]
+    definition = builder(*args)
+    tables = None
+    if CACHE_DIR:
+        path = _cache_path(name, definition)
+        tables = _load(path)
+    if tables is None:
+        tables = bitboard.build_tables(*definition)
+        if CACHE_DIR:
+            _store(path, tables)
+    _tables[name] = tables
+    return tables
+
+
+register('classic', classic)
+register('diagonal', diagonal)
+register('hyper', hyper)
+register('windoku', windoku)
+register('jigsaw', jigsaw)
+register('classic16', classic, 16)
+register('classic25', classic, 25)
+register('diagonal16', diagonal, 16)
+register('diagonal25', diagonal, 25)
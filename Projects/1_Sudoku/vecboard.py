@@ -0,0 +1,220 @@
+"""Vectorized propagation over many Sudoku boards at once.
+
+A batch of N boards is held as an (N, boxes, digits) boolean array whose entry
+``[k, i, d]`` is True while ``tables.symbols[d]`` is a candidate for box ``i``
+of board ``k``. ``eliminate`` and ``only_choice`` are applied to the whole
+batch as matrix products with the peer and unit incidence matrices of the
+layout, so the per-box Python loops of ``bitboard`` are replaced by a few array
+operations per pass. Only the boards that propagation leaves unsolved are
+branched, and their children are propagated together in the next batch.
+
+This engine requires NumPy, which is an optional dependency of the project.
+"""
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # the engine is optional; everything else works without it
+    np = None
+
+
+BATCHSIZE = 512  # the largest number of boards propagated in one batch
+
+STALLED, SOLVED, DEAD = 0, 1, -1
+
+Incidence = namedtuple('Incidence', ['peers', 'units'])
+Incidence.__doc__ = """The incidence matrices of one Sudoku layout as float32 arrays
+
+    peers(numpy.ndarray)
+        (boxes, boxes) matrix with a 1 wherever the column box is a peer of the row box
+
+    units(numpy.ndarray)
+        (units, boxes) matrix with a 1 wherever the box belongs to the unit
+"""
+
+_incidence = {}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the vectorized engine requires NumPy (pip install numpy)")
+
+
+def incidence(tables):
+    """Return the incidence matrices for a layout, building them on first use
+
+    Parameters
+    ----------
+    tables(bitboard.Tables)
+        the index tables for the board
+    """
+    _require_numpy()
+    if tables not in _incidence:
+        n_boxes = len(tables.boxes)
+        peers = np.zeros((n_boxes, n_boxes), np.float32)
+        for i, members in enumerate(tables.peers):
+            peers[i, list(members)] = 1
+        units = np.zeros((len(tables.units), n_boxes), np.float32)
+        for u, unit in enumerate(tables.units):
+            units[u, list(unit)] = 1
+        _incidence[tables] = Incidence(peers, units)
+    return _incidence[tables]
+
+
+def grids2tensor(grids, tables):
+    """Convert a list of grid strings into an (N, boxes, digits) candidate array
+
+    Every character that is not one of ``tables.symbols`` marks an empty box.
+    """
+    _require_numpy()
+    n_boxes, n = len(tables.boxes), tables.size
+    lookup = np.full(256, n, np.intp)
+    lookup[np.frombuffer(tables.symbols.encode(), np.uint8)] = np.arange(n)
+    codes = np.frombuffer(''.join(grids).encode(), np.uint8).reshape(len(grids), n_boxes)
+    # row n of the table is the "empty box" row with every candidate open
+    table = np.vstack([np.eye(n, dtype=bool), np.ones((1, n), bool)])
+    return table[lookup[codes]]
+
+
+def tensor2grids(cand, tables):
+    """Convert solved boards back into grid strings"""
+    _require_numpy()
+    symbols = np.frombuffer(tables.symbols.encode(), np.uint8)
+    rows = symbols[cand.argmax(2)]
+    return [row.tobytes().decode() for row in rows]
+
+
+def propagate(cand, matrices):
+    """Apply eliminate and only_choice to every board until none of them changes
+
+    Parameters
+    ----------
+    cand(numpy.ndarray)
+        an (N, boxes, digits) boolean candidate array; it is not modified
+
+    matrices(Incidence)
+        the incidence matrices for the layout (see ``incidence()``)
+
+    Returns
+    -------
+    tuple
+        (cand, status): the propagated boards, and an array holding ``SOLVED``,
+        ``DEAD`` or ``STALLED`` for each board
+    """
+    peers, units = matrices
+    cand = cand.copy()
+    dead = np.zeros(len(cand), bool)
+    active = np.arange(len(cand))
+    while len(active):
+        boards = cand[active]
+        before = boards.sum((1, 2))
+        # eliminate: drop every solved digit from the peers of its box
+        fixed = boards & (boards.sum(2) == 1)[:, :, None]
+        boards &= ~(np.matmul(peers, fixed.astype(np.float32)) > 0)
+        # only_choice: a digit with one place left in a unit goes there
+        places = np.matmul(units, boards.astype(np.float32))
+        forced = boards & (np.matmul(units.T, (places == 1).astype(np.float32)) > 0)
+        n_forced = forced.sum(2)
+        boards = np.where((n_forced > 0)[:, :, None], forced, boards)
+        cand[active] = boards
+        failed = ((boards.sum(2) == 0).any(1) | (places == 0).any((1, 2))
+                  | (n_forced > 1).any(1))
+        dead[active[failed]] = True
+        active = active[~failed & (boards.sum((1, 2)) != before)]
+    counts = cand.sum(2)
+    status = np.where(dead, DEAD, np.where((counts == 1).all(1), SOLVED, STALLED))
+    return cand, status
+
+
+def _branch(cand):
+    """Split each board on the first candidate of its box with the fewest candidates
+
+    Returns (left, right): in ``left`` the box is assigned the candidate and in
+    ``right`` the candidate is removed from it, so together the two halves
+    cover every solution of the input boards.
+    """
+    counts = cand.sum(2)
+    counts[counts <= 1] = cand.shape[2] + 1
+    rows = np.arange(len(cand))
+    box = counts.argmin(1)
+    digit = cand[rows, box].argmax(1)
+    left, right = cand.copy(), cand.copy()
+    left[rows, box] = False
+    left[rows, box, digit] = True
+    right[rows, box, digit] = False
+    return left, right
+
+
+def solve_tensor(cand, tables, batchsize=BATCHSIZE):
+    """Solve a batch of boards, propagating them together and branching only the stalled ones
+
+    Parameters
+    ----------
+    cand(numpy.ndarray)
+        an (N, boxes, digits) boolean candidate array
+
+    tables(bitboard.Tables)
+        the index tables for the boards
+
+    batchsize(int)
+        the largest number of boards propagated at once
+
+    Returns
+    -------
+    tuple
+        (solutions, found): the solved boards, and a boolean array that is False
+        for the boards without a solution (whose rows of ``solutions`` are
+        left as given)
+    """
+    if batchsize < 1:
+        raise ValueError("batchsize must be at least 1, got {}".format(batchsize))
+    matrices = incidence(tables)
+    solutions = cand.copy()
+    found = np.zeros(len(cand), bool)
+    # a stack of (boards, origin) batches, where origin holds the input index of each board
+    stack = [(cand, np.arange(len(cand)))]
+    while stack:
+        boards, origin = stack.pop()
+        if len(boards) > batchsize:
+            stack.append((boards[batchsize:], origin[batchsize:]))
+            boards, origin = boards[:batchsize], origin[:batchsize]
+        open_ = ~found[origin]
+        if not open_.all():
+            boards, origin = boards[open_], origin[open_]
+        if not len(boards):
+            continue
+        boards, status = propagate(boards, matrices)
+        solved = status == SOLVED
+        solutions[origin[solved]] = boards[solved]
+        found[origin[solved]] = True
+        stalled = (status == STALLED) & ~found[origin]
+        if stalled.any():
+            left, right = _branch(boards[stalled])
+            stack.append((right, origin[stalled]))
+            stack.append((left, origin[stalled]))
+    return solutions, found
+
+
+def solve_grids(grids, tables, batchsize=BATCHSIZE):
+    """Solve a list of grid strings with the vectorized engine
+
+    Parameters
+    ----------
+    grids(list)
+        the grid strings to solve; each must have one character per box
+
+    tables(bitboard.Tables)
+        the index tables for the grids
+
+    batchsize(int)
+        the largest number of boards propagated at once
+
+    Returns
+    -------
+    list
+        the solved grid string for each input grid, or None if it has no solution
+    """
+    if not grids:
+        return []
+    solutions, found = solve_tensor(grids2tensor(grids, tables), tables, batchsize)
+    return [grid if ok else None for grid, ok in zip(tensor2grids(solutions, tables), found)]
@@ -1,5 +1,6 @@
 
-from itertools import product
+from collections import Counter, defaultdict, namedtuple
+from itertools import chain, product
 from timeit import default_timer as timer
 
 from aimacode.logic import associate
@@ -68,6 +69,9 @@ def make_relations(name, *args, key=lambda x: True):
     return create_expressions("{}({})".format(name, ", ".join(c)) for c in product(*args) if key(c))
 
 
+ActionMasks = namedtuple('ActionMasks', ['pos', 'neg', 'add', 'rem'])
+
+
 class FluentState:
     """ Represent planning problem states as positive and negative fluents """
     def __init__(self, pos_list, neg_list):
@@ -159,3 +163,117 @@ def decode_state(state, fluent_map):
         else:
             fs.neg.append(fluent_map[idx])
     return fs
+
+
+class BitStateEncoder:
+    """ Encode planning states as integer bitmasks over an ordered fluent map
+
+    Bit ``i`` of a state is set when ``fluent_map[i]`` is True, so a state is a
+    single hashable int and applying an action is a couple of bitwise ops:
+
+        applicable: ``state & pos == pos and not state & neg``
+        successor:  ``state & ~rem | add``
+
+    where the four masks are precomputed for each action by ``compile_action``.
+
+    Parameters
+    ----------
+    fluent_map:
+        An ordered sequence of fluents
+    """
+    def __init__(self, fluent_map):
+        self.fluent_map = list(fluent_map)
+        self.bits = {f: 1 << idx for idx, f in enumerate(self.fluent_map)}
+        # a bit that no state has, required by actions that can never apply
+        self.impossible = 1 << len(self.fluent_map)
+
+    def mask(self, fluents):
+        """ Return the mask of the fluents, ignoring any that are not in the fluent map """
+        bits = self.bits
+        mask = 0
+        for f in fluents:
+            mask |= bits.get(f, 0)
+        return mask
+
+    def encode(self, fs):
+        """ Convert a FluentState into a bitmask of its positive fluents """
+        return self.mask(fs.pos)
+
+    def decode(self, state):
+        """ Convert a bitmask into a FluentState """
+        fs = FluentState([], [])
+        for idx, f in enumerate(self.fluent_map):
+            if state >> idx & 1:
+                fs.pos.append(f)
+            else:
+                fs.neg.append(f)
+        return fs
+
+    def literals(self, state):
+        """ Return the literal of every fluent in a state (``~fluent`` for False ones) """
+        return [f if state >> idx & 1 else ~f for idx, f in enumerate(self.fluent_map)]
+
+    def compile_action(self, action):
+        """ Return the (pos, neg, add, rem) masks of an action
+
+        A precondition on a fluent outside the fluent map can never be met, so
+        it adds the ``impossible`` bit to ``pos``.
+        """
+        pos = self.mask(action.precond_pos)
+        if any(f not in self.bits for f in chain(action.precond_pos, action.precond_neg)):
+            pos |= self.impossible
+        return ActionMasks(pos, self.mask(action.precond_neg),
+                           self.mask(action.effect_add), self.mask(action.effect_rem))
+
+
+def _bits(mask):
+    """ Yield the single-bit masks set in mask, lowest first """
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
+
+
+class SuccessorGenerator:
+    """ Find the actions applicable in a bitmask state without testing every action
+
+    Each action is filed under one of its positive preconditions -- the one
+    that the fewest actions need, so the lists stay short -- and actions
+    without positive preconditions are kept in a list that is always checked.
+    A state only visits the lists filed under its true fluents, so the work per
+    state grows with the number of true fluents and of the actions that could
+    apply to them rather than with the total number of actions.
+
+    Parameters
+    ----------
+    actions:
+        An ordered sequence of actions
+
+    masks:
+        A dict from each action to its ActionMasks (see BitStateEncoder)
+    """
+    def __init__(self, actions, masks):
+        self.actions = list(actions)
+        uses = Counter(bit for action in self.actions for bit in _bits(masks[action].pos))
+        self.always = []
+        self.index = defaultdict(list)
+        for k, action in enumerate(self.actions):
+            pos, neg, _, _ = masks[action]
+            entry = (k, pos, neg)
+            if pos:
+                self.index[min(_bits(pos), key=lambda bit: (uses[bit], bit))].append(entry)
+            else:
+                self.always.append(entry)
+        self.index = dict(self.index)
+
+    def applicable(self, state):
+        """ Return the actions applicable in state, in their original order """
+        found = [k for k, _, neg in self.always if not state & neg]
+        index = self.index
+        for bit in _bits(state):
+            for k, pos, neg in index.get(bit, ()):
+                if state & pos == pos and not state & neg:
+                    found.append(k)
+        found.sort()
+        actions = self.actions
+        return [actions[k] for k in found]
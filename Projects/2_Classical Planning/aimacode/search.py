@@ -223,7 +223,7 @@ def best_first_graph_search(problem, f):
             elif child in frontier:
                 incumbent = frontier[child]
                 if f(child) < f(incumbent):
-                    # del frontier[incumbent]
+                    del frontier[incumbent]
                     frontier.append(child)
     return None
 
@@ -10,7 +10,7 @@ import math
 
 import heapq
 from functools import lru_cache
-from collections import namedtuple, deque, Counter, defaultdict
+from collections import namedtuple, deque, defaultdict
 
 # ______________________________________________________________________________
 # Functions on Sequences and Iterables
@@ -363,31 +363,57 @@ class PriorityQueue(Queue):
     MODIFIED FROM AIMA VERSION
         - Use heapq
         - Use an additional dict to track membership
+        - Delete lazily: an item that is deleted or appended again has its old
+          heap entry marked stale, and stale entries are skipped when popping
+          (and dropped when they outnumber the live ones), so replacing an
+          item with a better one costs one push instead of a heap rebuild
+        - Break ties between equal f values in favor of the newest item (in
+          A* the deepest node, the one nearest a goal), so the items
+          themselves are never compared
     """
+    REMOVED = object()  # marks a stale heap entry
 
     def __init__(self, order=None, f=lambda x: x):
         self.A = []
-        self._A = Counter()
+        self._entries = {}
+        self._count = 0
         self.f = f
 
     def append(self, item):
-        heapq.heappush(self.A, (self.f(item), item))
-        self._A[item] += 1
+        """Add item, replacing any queued item that compares equal to it"""
+        if item in self._entries:
+            self._remove(item)
+        entry = [self.f(item), -self._count, item]
+        self._count += 1
+        self._entries[item] = entry
+        heapq.heappush(self.A, entry)
+
+    def _remove(self, key):
+        self._entries.pop(key)[-1] = self.REMOVED
+        if len(self.A) > 2 * len(self._entries) + 32:
+            self.A = [entry for entry in self.A if entry[-1] is not self.REMOVED]
+            heapq.heapify(self.A)
 
     def __len__(self):
-        return len(self.A)
+        return len(self._entries)
 
     def pop(self):
-        _, item = heapq.heappop(self.A)
-        self._A[item] -= 1
-        return item
+        while self.A:
+            item = heapq.heappop(self.A)[-1]
+            if item is not self.REMOVED:
+                del self._entries[item]
+                return item
+        raise IndexError('pop from an empty priority queue')
 
     def __contains__(self, item):
-        return self._A[item] > 0
+        return item in self._entries
 
     def __getitem__(self, key):
-        if self._A[key] > 0:
-            return key
+        """Return the queued item that compares equal to key"""
+        return self._entries[key][-1]
+
+    def __delitem__(self, key):
+        self._remove(key)
 
 # ______________________________________________________________________________
 # Useful Shorthands
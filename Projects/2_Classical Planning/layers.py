@@ -2,7 +2,8 @@
 from copy import deepcopy
 from functools import lru_cache
 from itertools import combinations
-from collections import defaultdict, MutableSet
+from collections import defaultdict
+from collections.abc import MutableSet
 
 from aimacode.planning import Action
 from aimacode.utils import expr, Expr
@@ -79,6 +80,60 @@ class ActionNode(object):
             and self.expr == other.expr)
 
 
+def _ids(mask):
+    """ Yield the indices of the bits set in mask, lowest first """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class ItemIndex(object):
+    """ Assign consecutive integer ids to the items (actions) of planning graph
+    layers, so that a set of items can be stored as an int bitmask with bit i
+    set for the item with id i.
+
+    Layers are built monotonically -- every layer contains all the items of the
+    layer of the same kind before it -- so each layer shares the index of the
+    layer it was copied from and the ids of an item agree across the graph.
+
+    Attributes
+    ----------
+    ids : dict
+        Mapping from each item to its id
+
+    items : list
+        The item with each id
+    """
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def register(self, item):
+        """ Return the id of item, assigning the next free id to new items """
+        idx = self.ids.get(item)
+        if idx is None:
+            idx = self.ids[item] = len(self.items)
+            self.items.append(item)
+        return idx
+
+
+class LiteralIndex(ItemIndex):
+    """ An ItemIndex that assigns ids to literals in complementary pairs:
+    ``X`` gets an even id ``2k`` and ``~X`` gets ``2k + 1``, so the id of the
+    negation of a literal is ``id ^ 1``.
+    """
+    def register(self, literal):
+        idx = self.ids.get(literal)
+        if idx is None:
+            positive = literal.args[0] if literal.op == '~' else literal
+            self.ids[positive] = len(self.items)
+            self.ids[~positive] = len(self.items) + 1
+            self.items += [positive, ~positive]
+            idx = self.ids[literal]
+        return idx
+
+
 class BaseLayer(MutableSet):
     """ Base class for ActionLayer and LiteralLayer classes for planning graphs
     that stores actions or literals as a mutable set (which enables terse,
@@ -108,13 +163,24 @@ class BaseLayer(MutableSet):
     _mutexes : dict
         Mapping from each item (action or literal) to a set containing all items
         that are mutex to the key. E.g., _mutexes[literaA] is a set of literals
-        that are mutex to literalA in this level of the planning graph
+        that are mutex to literalA in this level of the planning graph (built
+        on demand from _rows)
+
+    _index : ItemIndex
+        The integer ids of the items in the layer (shared with the layer this
+        one was copied from)
+
+    _rows : dict
+        Mapping from the id of each item with any mutexes to the bitmask of the
+        ids of the items that are mutex with it
 
     _ignore_mutexes : bool
         If _ignore_mutexes is True then _dynamic_ mutexes will be ignored (static
         mutexes are *always* enforced). For example, a literal X is always mutex
         with ~X, but "competing needs" or "inconsistent support" can be skipped
     """
+    _index_type = ItemIndex
+
     def __init__(self, items=[], parent_layer=None, ignore_mutexes=False):
         """
         Parameters
@@ -129,10 +195,16 @@ class BaseLayer(MutableSet):
             See _ignore_mutexes attribute
         """
         super().__init__()
+        if isinstance(items, BaseLayer) and type(items._index) is self._index_type:
+            self._index = items._index
+        else:
+            self._index = self._index_type()
         self.__store = set(iter(items))
+        for item in self.__store:
+            self._index.register(item)
         self.parents = defaultdict(set)
         self.children = defaultdict(set)
-        self._mutexes = defaultdict(set)
+        self._rows = {}
         self.parent_layer = parent_layer
         self._ignore_mutexes = ignore_mutexes
 
@@ -146,12 +218,20 @@ class BaseLayer(MutableSet):
         return len(self.__store)
 
     def __eq__(self, other):
-        return (len(self) == len(other) and
-            len(self._mutexes) == len(other._mutexes) and
-            0 == len(self ^ other) and self._mutexes == other._mutexes)
+        if len(self) != len(other) or len(self._rows) != len(other._rows) or len(self ^ other):
+            return False
+        if self._index is other._index:
+            return self._rows == other._rows
+        return self._mutexes == other._mutexes
+
+    @property
+    def _mutexes(self):
+        items = self._index.items
+        return {items[i]: set(items[j] for j in _ids(row)) for i, row in self._rows.items()}
 
     def add(self, item):
         self.__store.add(item)
+        self._index.register(item)
 
     def discard(self, item):
         try:
@@ -160,11 +240,20 @@ class BaseLayer(MutableSet):
             pass
 
     def set_mutex(self, itemA, itemB):
-        self._mutexes[itemA].add(itemB)
-        self._mutexes[itemB].add(itemA)
+        idA, idB = self._index.register(itemA), self._index.register(itemB)
+        self._rows[idA] = self._rows.get(idA, 0) | 1 << idB
+        self._rows[idB] = self._rows.get(idB, 0) | 1 << idA
 
     def is_mutex(self, itemA, itemB):
-        return itemA in self._mutexes.get(itemB, [])
+        ids = self._index.ids
+        idA, idB = ids.get(itemA), ids.get(itemB)
+        return idA is not None and idB is not None and bool(self._rows.get(idB, 0) >> idA & 1)
+
+    def _set_rows(self, rows):
+        """ Merge a mapping from item ids to bitmasks of mutex item ids into the layer """
+        for idx, row in rows.items():
+            if row:
+                self._rows[idx] = self._rows.get(idx, 0) | row
 
 
 class BaseActionLayer(BaseLayer):
@@ -176,16 +265,58 @@ class BaseActionLayer(BaseLayer):
             self.children.update({k: set(v) for k, v in actions.children.items()})
 
     def update_mutexes(self):
-        for actionA, actionB in combinations(iter(self), 2):
-            if self._serialize and actionA.no_op == actionB.no_op == False:
-                self.set_mutex(actionA, actionB)
-            elif (self._inconsistent_effects(actionA, actionB)
-                    or self._interference(actionA, actionB)):
-                self.set_mutex(actionA, actionB)
-            elif self._ignore_mutexes:
-                continue
-            elif self._competing_needs(actionA, actionB):
-                self.set_mutex(actionA, actionB)
+        """ Mark every pair of actions that are mutex by inconsistent effects,
+        interference, competing needs, or (when serialized) because neither one
+        is a no-op.
+
+        Rather than testing each pair of actions, the actions are inverted into
+        bitmasks over action ids: for each literal id, the actions that need it
+        and the actions that produce it. The mutex row of an action is then the
+        union of a few of those masks -- the producers and consumers of the
+        negation of each of its effects, the producers of the negation of each
+        of its preconditions, and the consumers of every literal that is mutex
+        with one of its preconditions in the parent layer.
+        """
+        parent = self.parent_layer
+        has_parent = isinstance(parent, BaseLiteralLayer)
+        literals = parent._index if has_parent else LiteralIndex()
+        actions = [(self._index.register(a), a) for a in self]
+        needs, makes = defaultdict(int), defaultdict(int)
+        edges = []
+        for idx, action in actions:
+            bit = 1 << idx
+            preconditions = [literals.register(l) for l in self.parents[action]]
+            effects = [literals.register(l) for l in self.children[action]]
+            for l in preconditions:
+                needs[l] |= bit
+            for l in effects:
+                makes[l] |= bit
+            edges.append((idx, action, preconditions, effects))
+
+        serial = 0
+        if self._serialize:
+            for idx, action in actions:
+                if not action.no_op:
+                    serial |= 1 << idx
+
+        competing = {}
+        if not self._ignore_mutexes and has_parent:
+            parent_rows = parent._rows
+            for l in needs:
+                row = 0
+                for m in _ids(parent_rows.get(l, 0)):
+                    row |= needs.get(m, 0)
+                competing[l] = row
+
+        rows = {}
+        for idx, action, preconditions, effects in edges:
+            row = serial if not action.no_op else 0
+            for l in effects:
+                row |= makes.get(l ^ 1, 0) | needs.get(l ^ 1, 0)
+            for l in preconditions:
+                row |= makes.get(l ^ 1, 0) | competing.get(l, 0)
+            rows[idx] = row & ~(1 << idx)
+        self._set_rows(rows)
 
     def add_inbound_edges(self, action, literals):
         # inbound action edges are many-to-one
@@ -197,6 +328,8 @@ class BaseActionLayer(BaseLayer):
 
 
 class BaseLiteralLayer(BaseLayer):
+    _index_type = LiteralIndex
+
     def __init__(self, literals=[], parent_layer=None, ignore_mutexes=False):
         super().__init__(literals, parent_layer, ignore_mutexes)
         if isinstance(literals, BaseLiteralLayer):
@@ -204,13 +337,36 @@ class BaseLiteralLayer(BaseLayer):
             self.children.update({k: set(v) for k, v in literals.children.items()})
 
     def update_mutexes(self):
-        for literalA, literalB in combinations(iter(self), 2):
-            if self._negation(literalA, literalB):
-                self.set_mutex(literalA, literalB)
-            elif self._ignore_mutexes:
-                continue
-            elif len(self.parent_layer) and self._inconsistent_support(literalA, literalB):
-                self.set_mutex(literalA, literalB)
+        """ Mark every pair of literals that are mutex by negation or by
+        inconsistent support.
+
+        Each literal gets the bitmask of the ids of the actions that achieve it
+        (its support) and the bitmask of the actions that are compatible with
+        at least one of them (not mutex in the parent layer). Two literals have
+        inconsistent support when the support of one misses the compatible
+        actions of the other, which is one AND per pair of literals.
+        """
+        literals = [(self._index.register(l), l) for l in self]
+        rows = {idx: 1 << (idx ^ 1) for idx, l in literals if ~l in self}
+        parent = self.parent_layer
+        if not self._ignore_mutexes and parent is not None and len(parent):
+            actions, parent_rows = parent._index, parent._rows
+            support, compatible = [], []
+            for idx, literal in literals:
+                achievers = 0
+                for action in self.parents[literal]:
+                    achievers |= 1 << actions.register(action)
+                allowed = 0
+                for a in _ids(achievers):
+                    allowed |= ~parent_rows.get(a, 0)
+                support.append(achievers)
+                compatible.append(allowed)
+            for i, j in combinations(range(len(literals)), 2):
+                if not support[j] & compatible[i]:
+                    idA, idB = literals[i][0], literals[j][0]
+                    rows[idA] = rows.get(idA, 0) | 1 << idB
+                    rows[idB] = rows.get(idB, 0) | 1 << idA
+        self._set_rows(rows)
 
     def add_inbound_edges(self, action, literals):
         # inbound literal edges are many-to-many
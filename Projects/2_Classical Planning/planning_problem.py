@@ -4,8 +4,9 @@ from functools import lru_cache
 from aimacode.logic import PropKB
 from aimacode.search import Node, Problem
 
-from _utils import encode_state, decode_state
+from _utils import BitStateEncoder, SuccessorGenerator
 from my_planning_graph import PlanningGraph
+from relaxed_planning_graph import RelaxedPlanningGraph
 
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
@@ -13,11 +14,54 @@ from my_planning_graph import PlanningGraph
 
 
 class BasePlanningProblem(Problem):
+    """ A planning problem whose states are integer bitmasks over ``state_map``
+
+    Bit ``i`` of a state is set when the fluent ``state_map[i]`` is True (see
+    ``_utils.BitStateEncoder``); ``encoder.decode(state)`` recovers the
+    FluentState.
+    """
     def __init__(self, initial, goal):
         self.state_map = sorted(initial.pos + initial.neg, key=str)
-        self.initial_state_TF = encode_state(initial, self.state_map)
+        self.encoder = BitStateEncoder(self.state_map)
+        self.initial_state_TF = self.encoder.encode(initial)
+        self.goal_mask = self.encoder.mask(goal)
+        self._masks_for = None
+        self._masks = {}
+        self._successors = None
+        self._relaxed_graph = None
         super().__init__(self.initial_state_TF, goal=goal)
 
+    def _compile(self):
+        """ Build the action masks and successor generator for ``actions_list``
+
+        This runs the first time they are needed (subclasses create their
+        actions after calling this constructor) and again if ``actions_list``
+        is replaced.
+        """
+        if self._masks_for is not self.actions_list:
+            self._masks = {action: self.encoder.compile_action(action) for action in self.actions_list}
+            self._successors = SuccessorGenerator(self.actions_list, self._masks)
+            self._relaxed_graph = RelaxedPlanningGraph(self)
+            self._masks_for = self.actions_list
+
+    @property
+    def action_masks(self):
+        """ A dict from each action in ``actions_list`` to its ActionMasks """
+        self._compile()
+        return self._masks
+
+    @property
+    def successors(self):
+        """ The SuccessorGenerator indexing the preconditions of ``actions_list`` """
+        self._compile()
+        return self._successors
+
+    @property
+    def relaxed_graph(self):
+        """ The RelaxedPlanningGraph of ``actions_list``, shared by every search node """
+        self._compile()
+        return self._relaxed_graph
+
     @lru_cache()
     def h_unmet_goals(self, node):
         """ This heuristic estimates the minimum number of actions that must be
@@ -25,7 +69,7 @@ class BasePlanningProblem(Problem):
         conditions by ignoring the preconditions required for an action to be
         executed.
         """
-        return sum(1 for i, f in enumerate(self.state_map) if not node.state[i] and f in self.goal)
+        return bin(self.goal_mask & ~node.state).count('1')
 
     @lru_cache()
     def h_pg_levelsum(self, node):
@@ -37,10 +81,13 @@ class BasePlanningProblem(Problem):
         See Also
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
+
+        Notes
+        -----
+        Mutexes are ignored, so the level costs come from the problem's
+        RelaxedPlanningGraph rather than from a PlanningGraph built per node.
         """
-        pg = PlanningGraph(self, node.state, serialize=True, ignore_mutexes=True)
-        score = pg.h_levelsum()
-        return score
+        return self.relaxed_graph.h_levelsum(node.state)
 
     @lru_cache()
     def h_pg_maxlevel(self, node):
@@ -52,10 +99,13 @@ class BasePlanningProblem(Problem):
         See Also
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
+
+        Notes
+        -----
+        Mutexes are ignored, so the level costs come from the problem's
+        RelaxedPlanningGraph rather than from a PlanningGraph built per node.
         """
-        pg = PlanningGraph(self, node.state, serialize=True, ignore_mutexes=True)
-        score = pg.h_maxlevel()
-        return score
+        return self.relaxed_graph.h_maxlevel(node.state)
 
     @lru_cache()
     def h_pg_setlevel(self, node):
@@ -67,37 +117,23 @@ class BasePlanningProblem(Problem):
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
         """
+        if self.relaxed_graph.h_maxlevel(node.state) == float('inf'):
+            return float('inf')  # some goal never appears, so the graph would never reach a set level
         pg = PlanningGraph(self, node.state, serialize=True)
         score = pg.h_setlevel()
         return score
 
     def actions(self, state):
         """ Return the actions that can be executed in the given state. """
-        possible_actions = []
-        fluent = decode_state(state, self.state_map)
-        for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in fluent.pos:
-                    is_possible = False
-                    break
-            if not is_possible: continue
-            for clause in action.precond_neg:
-                if clause not in fluent.neg:
-                    is_possible = False
-                    break
-            if is_possible: possible_actions.append(action)
-        return possible_actions
+        return self.successors.applicable(state)
 
     def result(self, state, action):
         """ Return the state that results from executing the given action in the
         given state. The action must be one of self.actions(state).
         """
-        return tuple([
-            (f and s not in action.effect_rem) or (s in action.effect_add)
-            for f, s in zip(state, self.state_map)
-        ])
+        masks = self.action_masks.get(action) or self.encoder.compile_action(action)
+        return state & ~masks.rem | masks.add
 
-    def goal_test(self, state: str) -> bool:
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached """
-        return all(f for f, c in zip(state, self.state_map) if c in self.goal)
+        return state & self.goal_mask == self.goal_mask
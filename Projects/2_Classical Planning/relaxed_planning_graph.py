@@ -0,0 +1,105 @@
+from aimacode.utils import Expr
+
+
+class RelaxedPlanningGraph:
+    """ Level costs of literals in a planning graph that ignores mutexes
+
+    Without mutexes an action joins a layer as soon as all of its
+    preconditions are present, and a literal joins the layer after the first
+    action that has it as an effect -- so the level cost of every literal can
+    be found with one counter per action instead of building the layers (the
+    unit-cost h_max propagation). The action/literal incidence is built once
+    per problem; evaluating a state then takes O(|actions| + |literals|) work,
+    and stops as soon as the level of every goal is known.
+
+    Literal ids follow the problem's bitmask states: fluent ``state_map[i]``
+    is literal ``2 * i`` and its negation ``~state_map[i]`` is ``2 * i + 1``.
+
+    Parameters
+    ----------
+    problem : BasePlanningProblem
+        The problem whose actions, goals and bitmask encoding are used
+    """
+    def __init__(self, problem):
+        self.n_fluents = len(problem.state_map)
+        index = {f: i for i, f in enumerate(problem.state_map)}
+        self.consumers = [[] for _ in range(2 * self.n_fluents)]
+        self.n_preconditions = []
+        self.effects = []
+        self.free_actions = []
+        for action in problem.actions_list:
+            preconditions = [self._literal(index, f, False) for f in action.precond_pos]
+            preconditions += [self._literal(index, f, True) for f in action.precond_neg]
+            if None in preconditions:
+                continue  # a precondition outside the fluent map is never met
+            effects = [self._literal(index, f, False) for f in action.effect_add]
+            effects += [self._literal(index, f, True) for f in action.effect_rem]
+            a = len(self.effects)
+            self.effects.append([e for e in effects if e is not None])
+            self.n_preconditions.append(len(set(preconditions)))
+            for lit in set(preconditions):
+                self.consumers[lit].append(a)
+            if not preconditions:
+                self.free_actions.append(a)
+        self.goals = [self._literal(index, g, False) for g in problem.goal]
+
+    @staticmethod
+    def _literal(index, fluent, negated):
+        if isinstance(fluent, Expr) and fluent.op == '~':
+            fluent, negated = fluent.args[0], not negated
+        i = index.get(fluent)
+        return None if i is None else 2 * i + negated
+
+    def levels(self, state, targets=None):
+        """ Return the level cost of every literal in the graph rooted at state
+
+        Unreachable literals get ``float('inf')``. If ``targets`` (a collection
+        of literal ids) is given, the expansion stops as soon as all of them
+        have a level, leaving the later literals at ``inf``.
+        """
+        inf = float('inf')
+        level = [inf] * (2 * self.n_fluents)
+        frontier = []
+        for i in range(self.n_fluents):
+            lit = 2 * i + (not state >> i & 1)
+            level[lit] = 0
+            frontier.append(lit)
+        pending = None
+        if targets is not None:
+            pending = set(t for t in targets if t is None or level[t] != 0)
+            if None in pending:
+                targets = pending = None  # an unknown goal is never reached; expand everything
+        consumers, effects = self.consumers, self.effects
+        remaining = list(self.n_preconditions)
+        ready = list(self.free_actions)
+        depth = 0
+        while (frontier or ready) and (pending is None or pending):
+            for lit in frontier:
+                for a in consumers[lit]:
+                    remaining[a] -= 1
+                    if not remaining[a]:
+                        ready.append(a)
+            depth += 1
+            frontier = []
+            for a in ready:
+                for lit in effects[a]:
+                    if level[lit] == inf:
+                        level[lit] = depth
+                        frontier.append(lit)
+                        if pending is not None:
+                            pending.discard(lit)
+            ready = []
+        return level
+
+    def goal_levels(self, state):
+        """ Return the level cost of each goal literal (``inf`` if unreachable) """
+        level = self.levels(state, self.goals)
+        return [float('inf') if g is None else level[g] for g in self.goals]
+
+    def h_levelsum(self, state):
+        """ The sum of the level costs of the goals (see PlanningGraph.h_levelsum) """
+        return sum(self.goal_levels(state))
+
+    def h_maxlevel(self, state):
+        """ The largest level cost of any goal (see PlanningGraph.h_maxlevel) """
+        return max(self.goal_levels(state), default=0)
@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from itertools import combinations
+
+from aimacode.utils import expr
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from layers import LiteralIndex
+from my_planning_graph import PlanningGraph, LiteralLayer, ActionLayer
+
+
+def pairwise_action_mutex(layer, actionA, actionB):
+    """ The mutex test of each pair of actions, written out as in the textbook """
+    if layer._serialize and actionA.no_op == actionB.no_op == False:
+        return True
+    if layer._inconsistent_effects(actionA, actionB) or layer._interference(actionA, actionB):
+        return True
+    return not layer._ignore_mutexes and layer._competing_needs(actionA, actionB)
+
+
+def pairwise_literal_mutex(layer, literalA, literalB):
+    if layer._negation(literalA, literalB):
+        return True
+    return (not layer._ignore_mutexes and len(layer.parent_layer) > 0
+            and layer._inconsistent_support(literalA, literalB))
+
+
+class TestBitsetMutexes(unittest.TestCase):
+    def assertMatchesPairwise(self, pg):
+        for layer in pg.action_layers:
+            for a, b in combinations(layer, 2):
+                self.assertEqual(layer.is_mutex(a, b), pairwise_action_mutex(layer, a, b), (a, b))
+                self.assertEqual(layer.is_mutex(a, b), layer.is_mutex(b, a))
+        for layer in pg.literal_layers:
+            for a, b in combinations(layer, 2):
+                self.assertEqual(layer.is_mutex(a, b), pairwise_literal_mutex(layer, a, b), (a, b))
+
+    def test_mutexes_match_pairwise_tests(self):
+        rng = random.Random(0)
+        for problem in (have_cake(), air_cargo_p1(), air_cargo_p2()):
+            state = problem.initial
+            for _ in range(3):
+                for serialize in (True, False):
+                    for ignore_mutexes in (False, True):
+                        self.assertMatchesPairwise(
+                            PlanningGraph(problem, state, serialize, ignore_mutexes).fill())
+                state = problem.result(state, rng.choice(problem.actions(state)))
+
+    def test_literal_ids_pair_negations(self):
+        index = LiteralIndex()
+        X, Y = expr('X'), expr('Y')
+        for literal in (~Y, X, Y, ~X):
+            self.assertEqual(index.items[index.register(literal)], literal)
+            self.assertEqual(index.register(literal) ^ 1, index.register(~literal))
+        self.assertEqual(len(index.items), 4)
+
+    def test_layers_share_ids(self):
+        X, Y = expr('X'), expr('Y')
+        layer = LiteralLayer([X, ~X], ActionLayer())
+        layer.update_mutexes()
+        child = LiteralLayer(layer, ActionLayer())
+        child.add(Y)
+        child.update_mutexes()
+        self.assertIs(child._index, layer._index)
+        self.assertNotEqual(child, layer)
+        child.discard(Y)
+        self.assertEqual(child, layer)
+        self.assertEqual(layer._mutexes, {X: {~X}, ~X: {X}})
+
+    def test_set_mutex(self):
+        X, Y, Z = expr('X'), expr('Y'), expr('Z')
+        layer = LiteralLayer([X, Y, Z], ActionLayer())
+        layer.set_mutex(X, Z)
+        self.assertTrue(layer.is_mutex(Z, X))
+        self.assertFalse(layer.is_mutex(X, Y))
+        self.assertFalse(layer.is_mutex(X, expr('W')))
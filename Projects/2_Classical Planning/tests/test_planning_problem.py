@@ -0,0 +1,89 @@
+import unittest
+
+from aimacode.planning import Action
+from aimacode.search import breadth_first_search
+from aimacode.utils import expr
+from _utils import BitStateEncoder, SuccessorGenerator, decode_state, encode_state
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+
+
+def reference_actions(problem, state):
+    """ The applicable actions found by scanning the decoded FluentState """
+    fluent = decode_state(state, problem.state_map)
+    return [a for a in problem.actions_list
+            if all(c in fluent.pos for c in a.precond_pos) and all(c in fluent.neg for c in a.precond_neg)]
+
+
+def reference_result(problem, state, action):
+    return tuple((f and s not in action.effect_rem) or (s in action.effect_add)
+                 for f, s in zip(state, problem.state_map))
+
+
+class TestBitStates(unittest.TestCase):
+    def test_round_trip(self):
+        problem = air_cargo_p1()
+        fs = problem.encoder.decode(problem.initial)
+        self.assertEqual(problem.encoder.encode(fs), problem.initial)
+        self.assertEqual(encode_state(fs, problem.state_map),
+                         tuple(bool(problem.initial >> i & 1) for i in range(len(problem.state_map))))
+
+    def test_matches_fluent_states(self):
+        for problem in (have_cake(), air_cargo_p2()):
+            frontier, seen = [problem.initial], {problem.initial}
+            while frontier and len(seen) < 300:
+                state = frontier.pop()
+                bools = encode_state(problem.encoder.decode(state), problem.state_map)
+                actions = problem.actions(state)
+                self.assertEqual(actions, reference_actions(problem, bools))
+                for action in actions:
+                    child = problem.result(state, action)
+                    self.assertEqual(encode_state(problem.encoder.decode(child), problem.state_map),
+                                     reference_result(problem, bools, action))
+                    if child not in seen:
+                        seen.add(child)
+                        frontier.append(child)
+
+    def test_goal_test(self):
+        problem = have_cake()
+        node = breadth_first_search(problem)
+        self.assertTrue(problem.goal_test(node.state))
+        self.assertFalse(problem.goal_test(problem.initial))
+        self.assertEqual(problem.h_unmet_goals(node), 0)
+
+    def test_unknown_precondition(self):
+        encoder = BitStateEncoder([expr('A'), expr('B')])
+        action = Action(expr('Act()'), [[expr('A'), expr('C')], []], [[expr('B')], []])
+        pos, neg, add, rem = encoder.compile_action(action)
+        state = encoder.mask([expr('A'), expr('B')])
+        self.assertNotEqual(state & pos, pos)
+        self.assertEqual(add, encoder.mask([expr('B')]))
+
+
+class TestSuccessorGenerator(unittest.TestCase):
+    def test_matches_scan(self):
+        encoder = BitStateEncoder([expr('A'), expr('B'), expr('C')])
+        actions = [
+            Action(expr('NeedsA()'), [[expr('A')], []], [[], []]),
+            Action(expr('NeedsAB()'), [[expr('A'), expr('B')], []], [[], []]),
+            Action(expr('NotC()'), [[], [expr('C')]], [[], []]),
+            Action(expr('Free()'), [[], []], [[], []]),
+            Action(expr('BNotA()'), [[expr('B')], [expr('A')]], [[], []]),
+            Action(expr('Never()'), [[expr('D')], []], [[], []]),
+        ]
+        masks = {action: encoder.compile_action(action) for action in actions}
+        generator = SuccessorGenerator(actions, masks)
+        for state in range(8):
+            expected = [a for a in actions
+                        if state & masks[a].pos == masks[a].pos and not state & masks[a].neg]
+            self.assertEqual(generator.applicable(state), expected)
+
+    def test_problem_uses_index(self):
+        problem = air_cargo_p2()
+        self.assertLess(max(map(len, problem.successors.index.values())), len(problem.actions_list))
+        self.assertEqual(problem.actions(problem.initial), reference_actions(
+            problem, encode_state(problem.encoder.decode(problem.initial), problem.state_map)))
+
+
+if __name__ == '__main__':
+    unittest.main()
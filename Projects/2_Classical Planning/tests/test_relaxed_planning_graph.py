@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from aimacode.planning import Action
+from aimacode.search import breadth_first_search
+from aimacode.utils import expr
+from _utils import FluentState
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from my_planning_graph import PlanningGraph
+from planning_problem import BasePlanningProblem
+from relaxed_planning_graph import RelaxedPlanningGraph
+
+
+class StuckProblem(BasePlanningProblem):
+    """ A goal that no action can reach """
+    def __init__(self):
+        super().__init__(FluentState([expr('A')], [expr('B'), expr('C')]), [expr('C')])
+        self.actions_list = [Action(expr('MakeB()'), [[expr('A')], []], [[expr('B')], []])]
+
+
+class TestRelaxedPlanningGraph(unittest.TestCase):
+    def test_levelsum_matches_planning_graph(self):
+        rng = random.Random(0)
+        for problem in (have_cake(), air_cargo_p1(), air_cargo_p2()):
+            state = problem.initial
+            for _ in range(10):
+                pg = PlanningGraph(problem, state, serialize=True, ignore_mutexes=True)
+                self.assertEqual(problem.relaxed_graph.h_levelsum(state), pg.h_levelsum())
+                state = problem.result(state, rng.choice(problem.actions(state)))
+
+    def test_level_costs(self):
+        problem = air_cargo_p1()
+        graph = RelaxedPlanningGraph(problem)
+        level = graph.levels(problem.initial)
+        self.assertTrue(all(level[2 * i + (not problem.initial >> i & 1)] == 0
+                            for i in range(len(problem.state_map))))
+        # each cargo must be loaded, flown and unloaded
+        self.assertEqual(graph.goal_levels(problem.initial), [2, 2])
+        self.assertEqual(graph.h_maxlevel(problem.initial), 2)
+        goal = breadth_first_search(problem).state
+        self.assertEqual(graph.h_levelsum(goal), 0)
+        self.assertEqual(graph.h_maxlevel(goal), 0)
+
+    def test_unreachable_goal(self):
+        problem = StuckProblem()
+        self.assertEqual(problem.relaxed_graph.h_levelsum(problem.initial), float('inf'))
+        self.assertEqual(problem.relaxed_graph.levels(problem.initial)[2], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
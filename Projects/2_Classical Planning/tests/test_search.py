@@ -0,0 +1,48 @@
+import unittest
+
+from aimacode.search import Node, astar_search, uniform_cost_search
+from aimacode.utils import PriorityQueue
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+
+
+class TestPriorityQueue(unittest.TestCase):
+    def test_decrease_key(self):
+        frontier = PriorityQueue(min, lambda node: node.path_cost)
+        frontier.append(Node('a', path_cost=5))
+        frontier.append(Node('b', path_cost=3))
+        better = Node('a', path_cost=1)
+        self.assertEqual(frontier[better].path_cost, 5)
+        del frontier[better]
+        frontier.append(better)
+        self.assertEqual(len(frontier), 2)
+        self.assertIs(frontier.pop(), better)
+        self.assertEqual(frontier.pop().state, 'b')
+        self.assertFalse(frontier)
+        with self.assertRaises(IndexError):
+            frontier.pop()
+
+    def test_stale_entries_are_dropped(self):
+        frontier = PriorityQueue(min, lambda node: node.path_cost)
+        for cost in range(1000, 0, -1):
+            frontier.append(Node('a', path_cost=cost))
+        self.assertEqual(len(frontier), 1)
+        self.assertLess(len(frontier.A), 100)
+        self.assertEqual(frontier.pop().path_cost, 1)
+        self.assertNotIn(Node('a'), frontier)
+
+    def test_ties_prefer_newest(self):
+        frontier = PriorityQueue(min, lambda node: 0)
+        frontier.extend(Node(state) for state in 'abc')
+        self.assertEqual([frontier.pop().state for _ in range(3)], ['c', 'b', 'a'])
+
+
+class TestOptimalPlans(unittest.TestCase):
+    def test_optimal_plan_lengths(self):
+        for problem_fn, length in ((air_cargo_p1, 6), (air_cargo_p2, 9)):
+            problem = problem_fn()
+            self.assertEqual(len(uniform_cost_search(problem).solution()), length)
+            self.assertEqual(len(astar_search(problem, problem.h_unmet_goals).solution()), length)
+
+
+if __name__ == '__main__':
+    unittest.main()